@@ -0,0 +1,47 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a9d3f6c2b8e4"
+down_revision = "f1a7c3d9e5b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("transcript_segments", sa.Column("speaker", sa.String(255), nullable=True))
+    op.create_index(
+        "ix_transcript_segments_meeting_id_start_ms", "transcript_segments", ["meeting_id", "start_ms"]
+    )
+
+    # Copy batch transcripts into rows. Their JSON is {"items": [{"start", "end", "text"}]} in
+    # seconds (older rows may be a bare list); live meetings already have rows and are skipped.
+    op.execute(
+        """
+        INSERT INTO transcript_segments (meeting_id, seq, text, start_ms, end_ms, speaker, created_at)
+        SELECT
+            t.meeting_id,
+            e.ord - 1,
+            coalesce(e.item->>'text', ''),
+            round((e.item->>'start')::float8 * 1000)::int,
+            round((e.item->>'end')::float8 * 1000)::int,
+            e.item->>'speaker',
+            t.created_at
+        FROM transcripts t
+        CROSS JOIN LATERAL json_array_elements(
+            CASE
+                WHEN json_typeof(t.segments) = 'array' THEN t.segments
+                WHEN json_typeof(t.segments) = 'object'
+                     AND json_typeof(t.segments->'items') = 'array' THEN t.segments->'items'
+            END
+        ) WITH ORDINALITY AS e(item, ord)
+        WHERE json_typeof(e.item) = 'object'
+          AND NOT EXISTS (SELECT 1 FROM transcript_segments s WHERE s.meeting_id = t.meeting_id)
+        """
+    )
+
+
+def downgrade() -> None:
+    # Backfilled rows are left in place; they are indistinguishable from live ones
+    op.drop_index("ix_transcript_segments_meeting_id_start_ms", table_name="transcript_segments")
+    op.drop_column("transcript_segments", "speaker")
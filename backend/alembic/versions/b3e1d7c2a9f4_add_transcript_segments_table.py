@@ -0,0 +1,28 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "b3e1d7c2a9f4"
+down_revision = "7c1a9a8b4c2e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transcript_segments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("meeting_id", sa.Integer(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("start_ms", sa.Integer(), nullable=True),
+        sa.Column("end_ms", sa.Integer(), nullable=True),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["meeting_id"], ["meetings.id"], name="fk_transcript_segments_meeting_id_meetings"),
+        sa.UniqueConstraint("meeting_id", "seq", name="uq_transcript_segments_meeting_id_seq"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("transcript_segments")
@@ -0,0 +1,26 @@
+from alembic import op
+
+
+revision = "c7e2b5d1f4a8"
+down_revision = "a9d3f6c2b8e4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stored generated columns: Postgres fills them on every insert/update, including backfilled rows
+    for table in ("transcript_segments", "summaries"):
+        op.execute(
+            f"""
+            ALTER TABLE {table}
+            ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (to_tsvector('english', coalesce(text, ''))) STORED
+            """
+        )
+        op.create_index(f"ix_{table}_search_vector", table, ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    for table in ("summaries", "transcript_segments"):
+        op.drop_index(f"ix_{table}_search_vector", table_name=table)
+        op.drop_column(table, "search_vector")
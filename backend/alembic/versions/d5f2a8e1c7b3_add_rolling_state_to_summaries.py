@@ -0,0 +1,16 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "d5f2a8e1c7b3"
+down_revision = "b3e1d7c2a9f4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("summaries", sa.Column("rolling_state", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("summaries", "rolling_state")
@@ -0,0 +1,30 @@
+from alembic import op
+
+
+revision = "e8c4b1f6a2d9"
+down_revision = "d5f2a8e1c7b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_meetings_created_at_id", "meetings", ["created_at", "id"])
+
+    # The meeting list joins user_access on (pubkey, meeting_id); drop duplicate grants
+    # so the join can't repeat a meeting, then make the pair unique
+    op.execute(
+        """
+        DELETE FROM user_access a
+        USING user_access b
+        WHERE a.pubkey = b.pubkey AND a.meeting_id = b.meeting_id AND a.id > b.id
+        """
+    )
+    op.create_unique_constraint("uq_user_access_pubkey_meeting_id", "user_access", ["pubkey", "meeting_id"])
+    # Covered by the unique constraint's index
+    op.drop_index("ix_user_access_pubkey", table_name="user_access")
+
+
+def downgrade() -> None:
+    op.create_index("ix_user_access_pubkey", "user_access", ["pubkey"])
+    op.drop_constraint("uq_user_access_pubkey_meeting_id", "user_access", type_="unique")
+    op.drop_index("ix_meetings_created_at_id", table_name="meetings")
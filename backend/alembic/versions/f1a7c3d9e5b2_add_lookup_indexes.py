@@ -0,0 +1,30 @@
+from alembic import op
+
+
+revision = "f1a7c3d9e5b2"
+down_revision = "e8c4b1f6a2d9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Meetings have at most one transcript and one summary; keep the newest of any duplicates
+    for table in ("transcripts", "summaries"):
+        op.execute(
+            f"""
+            DELETE FROM {table} a
+            USING {table} b
+            WHERE a.meeting_id = b.meeting_id AND a.id < b.id
+            """
+        )
+    op.create_unique_constraint("uq_transcripts_meeting_id", "transcripts", ["meeting_id"])
+    op.create_unique_constraint("uq_summaries_meeting_id", "summaries", ["meeting_id"])
+    op.create_index("ix_participants_meeting_id", "participants", ["meeting_id"])
+    op.create_index("ix_meetings_zoom_meeting_uuid", "meetings", ["zoom_meeting_uuid"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_meetings_zoom_meeting_uuid", table_name="meetings")
+    op.drop_index("ix_participants_meeting_id", table_name="participants")
+    op.drop_constraint("uq_summaries_meeting_id", "summaries", type_="unique")
+    op.drop_constraint("uq_transcripts_meeting_id", "transcripts", type_="unique")
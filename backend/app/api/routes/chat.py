@@ -1,14 +1,20 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
+import logging
 import uuid
 from sqlalchemy import select
 
-from app.services.meeting_agent import create_meeting_agent
+from app.config import settings
+from app.services import llm_cache
+from app.services.meeting_agent import create_meeting_agent, is_cacheable_answer, stream_meeting_agent
 from app.database import async_session
 from app.models.chat import Conversation, ChatMessage
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 class MessagePart(BaseModel):
@@ -40,9 +46,32 @@ class ChatRequest(BaseModel):
     conversation_id: str | None = None
 
 
+async def _data_version() -> int:
+    # The cache uses the sync Redis client; run it on a thread so the event loop isn't blocked
+    return await asyncio.to_thread(llm_cache.data_version, "all")
+
+
+async def _cached_answer(user_message: str, version: int) -> str | None:
+    # The agent only sees the latest user message, so that plus the data version is the whole input
+    return await asyncio.to_thread(llm_cache.lookup, "chat", settings.chat_model, user_message, version)
+
+
+async def _store_answer(user_message: str, response: str, version: int):
+    await asyncio.to_thread(
+        llm_cache.store, "chat", settings.chat_model, user_message, response, version,
+        ttl=settings.llm_cache_chat_ttl,
+    )
+
+
 @router.post("/chat")
-async def chat(request: ChatRequest):
-    agent = create_meeting_agent()
+async def chat(request: ChatRequest, events: bool = False):
+    """Answer the latest user message, streaming tokens as the LLM produces them.
+
+    By default the body is plain answer text for the AI SDK's
+    TextStreamChatTransport. With `?events=true` it is NDJSON: {"type": "delta"}
+    tokens, {"type": "tool"} progress around tool calls and a final {"type": "done"}.
+    The assistant message is stored once the answer is complete.
+    """
     conversation_id = request.conversation_id or str(uuid.uuid4())
 
     user_message = ""
@@ -65,29 +94,45 @@ async def chat(request: ChatRequest):
         session.add(ChatMessage(conversation_id=conversation_id, role="user", content=user_message))
         await session.commit()
 
+    def encode(event: dict) -> str | None:
+        if events:
+            return json.dumps({**event, "conversation_id": conversation_id}) + "\n"
+        return event["text"] if event["type"] == "delta" else None
+
     async def generate():
+        version = await _data_version()
+        response = await _cached_answer(user_message, version)
         try:
-            response = await agent.run(user_message)
-
-            # Stream plain text chunks for AI SDK v5 TextStreamChatTransport
-            chunks = [response[i:i+50] for i in range(0, len(response), 50)]
-
-            for chunk in chunks:
-                yield chunk
-
-            try:
-                async with async_session() as session:
-                    session.add(ChatMessage(conversation_id=conversation_id, role="assistant", content=response))
-                    await session.commit()
-            except Exception:
-                pass
+            if response is not None:
+                yield encode({"type": "delta", "text": response})
+                if events:
+                    yield encode({"type": "done", "text": response, "cached": True})
+            else:
+                async for event in stream_meeting_agent(user_message):
+                    if event["type"] == "done":
+                        response = event["text"]
+                        if event["cacheable"]:
+                            await _store_answer(user_message, response, version)
+                        event = {"type": "done", "text": response}
+                    chunk = encode(event)
+                    if chunk:
+                        yield chunk
+        except Exception as e:
+            logger.error(f"Chat stream failed for conversation {conversation_id}: {e}")
+            yield encode({"type": "delta", "text": f"Error: {str(e)}"})
+            return
 
+        try:
+            async with async_session() as session:
+                session.add(ChatMessage(conversation_id=conversation_id, role="assistant", content=response))
+                await session.commit()
         except Exception as e:
-            yield f"Error: {str(e)}"
+            logger.warning(f"Failed to store assistant message for conversation {conversation_id}: {e}")
 
     return StreamingResponse(
         generate(),
-        media_type="text/plain; charset=utf-8",
+        media_type="application/x-ndjson" if events else "text/plain; charset=utf-8",
+        headers={"X-Accel-Buffering": "no"},
     )
 
 
@@ -116,7 +161,12 @@ async def chat_non_streaming(request: ChatRequest):
         session.add(ChatMessage(conversation_id=conversation_id, role="user", content=user_message))
         await session.commit()
 
-    response = await agent.run(user_message)
+    version = await _data_version()
+    response = await _cached_answer(user_message, version)
+    if response is None:
+        response = await agent.run(user_message)
+        if is_cacheable_answer(agent):
+            await _store_answer(user_message, response, version)
 
     async with async_session() as session:
         session.add(ChatMessage(conversation_id=conversation_id, role="assistant", content=response))
@@ -139,6 +189,12 @@ async def chat_non_streaming(request: ChatRequest):
     }
 
 
+@router.get("/chat/cache/metrics")
+async def chat_cache_metrics():
+    """Hit/miss counters of the LLM answer cache (summaries and chat)."""
+    return await asyncio.to_thread(llm_cache.stats)
+
+
 @router.get("/chat/history/{conversation_id}")
 async def chat_history(conversation_id: str):
     try:
@@ -1,24 +1,34 @@
+import base64
+import json
 import os
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header
-from sqlalchemy import select
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, Response
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, undefer
 
 from app.config import settings
 from app.database import get_db
-from app.models.meeting import Meeting, Participant, Summary
+from app.models.meeting import Meeting, Participant, Summary, Transcript, TranscriptSegment
 from app.models.user_access import UserAccess
 from app.schemas.meeting import (
     MeetingCreate,
     MeetingResponse,
     MeetingListResponse,
+    ParticipantResponse,
+    SearchHit,
+    SegmentResponse,
     StatusResponse,
+    SummaryResponse,
+    TranscriptResponse,
     FollowupRequest,
 )
 from app.services.recall import recall_service
+from app.services.search import search_statement
 import redis
 from app.tasks.email import send_followup_task
-from app.celery_app import celery_app
+from app.tasks.dedup import enqueue_once
 from app.tasks.transcription import transcribe_audio_from_url_task
 
 router = APIRouter()
@@ -78,44 +88,211 @@ async def create_meeting(
     return meeting
 
 
+def _encode_cursor(created_at: datetime, meeting_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), meeting_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, meeting_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(meeting_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("", response_model=list[MeetingListResponse])
-async def list_meetings(db: AsyncSession = Depends(get_db), x_user_pubkey: str | None = Header(None, convert_underscores=False)):
-    if x_user_pubkey:
-        from sqlalchemy import select as sql_select
-        access_result = await db.execute(sql_select(UserAccess.meeting_id).where(UserAccess.pubkey == x_user_pubkey))
-        ids = [row[0] for row in access_result.all()]
-        if not ids:
-            return []
-        result = await db.execute(select(Meeting).where(Meeting.id.in_(ids)).order_by(Meeting.created_at.desc()))
-        meetings = result.scalars().all()
-        return meetings
-    result = await db.execute(select(Meeting).order_by(Meeting.created_at.desc()))
-    meetings = result.scalars().all()
-    return meetings
-
-
-@router.get("/{meeting_id}", response_model=MeetingResponse)
-async def get_meeting(meeting_id: int, db: AsyncSession = Depends(get_db), x_user_pubkey: str | None = Header(None, convert_underscores=False)):
+async def list_meetings(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    x_user_pubkey: str | None = Header(None, convert_underscores=False),
+):
+    """List meetings, newest first, one page at a time.
+
+    Pages are keyed on (created_at, id), so each one is an index range scan no
+    matter how deep. When there are more meetings the `X-Next-Cursor` response
+    header holds the value to pass as `cursor` for the next page.
+
+    Args:
+        cursor: X-Next-Cursor from the previous page
+        limit: Page size
+        x_user_pubkey: Only list meetings this user has access to
+    """
+    query = select(
+        Meeting.id, Meeting.title, Meeting.date, Meeting.status, Meeting.created_at
+    )
     if x_user_pubkey:
-        from sqlalchemy import select as sql_select
-        chk = await db.execute(sql_select(UserAccess).where(UserAccess.pubkey == x_user_pubkey, UserAccess.meeting_id == meeting_id))
+        query = query.join(
+            UserAccess, (UserAccess.meeting_id == Meeting.id) & (UserAccess.pubkey == x_user_pubkey)
+        )
+    if cursor:
+        query = query.where(tuple_(Meeting.created_at, Meeting.id) < _decode_cursor(cursor))
+    query = query.order_by(Meeting.created_at.desc(), Meeting.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows
+
+
+@router.get("/search", response_model=list[SearchHit])
+async def search_meetings(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    x_user_pubkey: str | None = Header(None, convert_underscores=False),
+):
+    """Full-text search over transcript segments and summaries, best matches first.
+
+    Snippets are HTML-escaped text with the matched words in <mark> tags.
+
+    Args:
+        q: Search terms; supports "quoted phrases", OR and -excluded words
+        limit: Maximum number of hits
+        x_user_pubkey: Only search meetings this user has access to
+    """
+    rows = (await db.execute(search_statement(q, limit, x_user_pubkey))).all()
+    return [
+        SearchHit(
+            kind=r.kind,
+            meeting_id=r.meeting_id,
+            title=r.title,
+            date=r.date,
+            seq=r.seq,
+            start=r.start_ms / 1000 if r.start_ms is not None else None,
+            end=r.end_ms / 1000 if r.end_ms is not None else None,
+            speaker=r.speaker,
+            snippet=r.snippet,
+            rank=r.rank,
+        )
+        for r in rows
+    ]
+
+
+MEETING_FIELDS = {"transcript", "segments", "summary", "participants"}
+
+
+def _parse_fields(fields: str | None) -> set[str]:
+    if fields is None:
+        return MEETING_FIELDS
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - MEETING_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+async def _check_access(db: AsyncSession, meeting_id: int, pubkey: str | None):
+    if pubkey:
+        chk = await db.execute(select(UserAccess.id).where(UserAccess.pubkey == pubkey, UserAccess.meeting_id == meeting_id))
         if not chk.scalar_one_or_none():
             raise HTTPException(status_code=403, detail="Forbidden")
-    result = await db.execute(
-        select(Meeting)
-        .options(
-            selectinload(Meeting.transcript),
-            selectinload(Meeting.summary),
-            selectinload(Meeting.participants)
-        )
-        .where(Meeting.id == meeting_id)
-    )
+
+
+@router.get("/{meeting_id}", response_model=MeetingResponse, response_model_exclude_unset=True)
+async def get_meeting(
+    meeting_id: int,
+    fields: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    x_user_pubkey: str | None = Header(None, convert_underscores=False),
+):
+    """Get a meeting with the related data the caller asks for.
+
+    Args:
+        fields: Comma-separated subset of transcript, segments, summary and
+            participants. Only those are loaded and returned; `segments` is the
+            transcript's full segment list (see /{meeting_id}/segments for
+            ranges). Omit to get everything.
+        x_user_pubkey: Require this user to have access to the meeting
+    """
+    wanted = _parse_fields(fields)
+    await _check_access(db, meeting_id, x_user_pubkey)
+
+    options = []
+    if wanted & {"transcript", "segments"}:
+        columns = [Transcript.text] + ([Transcript.segments] if "segments" in wanted else [])
+        options.append(selectinload(Meeting.transcript).options(*(undefer(c) for c in columns)))
+    if "summary" in wanted:
+        options.append(selectinload(Meeting.summary))
+    if "participants" in wanted:
+        options.append(selectinload(Meeting.participants))
+    result = await db.execute(select(Meeting).options(*options).where(Meeting.id == meeting_id))
     meeting = result.scalar_one_or_none()
 
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
 
-    return meeting
+    # Built by hand so serialization never touches an unloaded relation or column
+    response = MeetingResponse(
+        id=meeting.id,
+        title=meeting.title,
+        date=meeting.date,
+        audio_url=meeting.audio_url,
+        status=meeting.status,
+        created_at=meeting.created_at,
+    )
+    if wanted & {"transcript", "segments"}:
+        transcript = meeting.transcript
+        response.transcript = None
+        if transcript:
+            response.transcript = TranscriptResponse(
+                id=transcript.id,
+                text=transcript.text,
+                created_at=transcript.created_at,
+                **({"segments": transcript.segments} if "segments" in wanted else {}),
+            )
+    if "summary" in wanted:
+        response.summary = SummaryResponse.model_validate(meeting.summary) if meeting.summary else None
+    if "participants" in wanted:
+        response.participants = [ParticipantResponse.model_validate(p) for p in meeting.participants]
+    return response
+
+
+@router.get("/{meeting_id}/segments", response_model=list[SegmentResponse])
+async def get_meeting_segments(
+    meeting_id: int,
+    from_: float | None = Query(None, alias="from", ge=0),
+    to: float | None = Query(None, ge=0),
+    db: AsyncSession = Depends(get_db),
+    x_user_pubkey: str | None = Header(None, convert_underscores=False),
+):
+    """Transcript segments overlapping a time range, in order.
+
+    Reads transcript_segments only, with the range resolved on its
+    (meeting_id, start_ms) index; the transcript's segments JSON is never loaded.
+
+    Args:
+        from_: Range start in seconds (`from` in the query string)
+        to: Range end in seconds, exclusive
+        x_user_pubkey: Require this user to have access to the meeting
+    """
+    await _check_access(db, meeting_id, x_user_pubkey)
+    meeting = await db.get(Meeting, meeting_id)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    query = select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id)
+    # Segments without timing are kept, as there is no way to place them
+    if from_ is not None:
+        query = query.where(or_(TranscriptSegment.end_ms.is_(None), TranscriptSegment.end_ms >= int(from_ * 1000)))
+    if to is not None:
+        query = query.where(or_(TranscriptSegment.start_ms.is_(None), TranscriptSegment.start_ms < int(to * 1000)))
+    rows = (await db.execute(query.order_by(TranscriptSegment.seq))).scalars().all()
+    return [
+        SegmentResponse(
+            seq=r.seq,
+            start=r.start_ms / 1000 if r.start_ms is not None else None,
+            end=r.end_ms / 1000 if r.end_ms is not None else None,
+            speaker=r.speaker,
+            text=r.text,
+            confidence=r.confidence,
+        )
+        for r in rows
+    ]
 
 
 @router.delete("/{meeting_id}")
@@ -176,8 +353,12 @@ async def grant_access(meeting_id: int, pubkey: str = Form(...), db: AsyncSessio
     meeting = result.scalar_one_or_none()
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
-    entry = UserAccess(pubkey=pubkey, meeting_id=meeting_id)
-    db.add(entry)
+    # Granting twice is a no-op rather than a unique violation
+    await db.execute(
+        pg_insert(UserAccess)
+        .values(pubkey=pubkey, meeting_id=meeting_id, created_at=datetime.utcnow())
+        .on_conflict_do_nothing(constraint="uq_user_access_pubkey_meeting_id")
+    )
     await db.commit()
     return {"status": "ok", "meeting_id": meeting_id, "pubkey": pubkey}
 
@@ -223,7 +404,7 @@ async def summarize_meeting(meeting_id: int, db: AsyncSession = Depends(get_db))
     if not transcript:
         raise HTTPException(status_code=400, detail="Meeting must be transcribed first")
 
-    task = celery_app.send_task("app.tasks.summarization.generate_summary_task", args=[meeting_id])
+    task = enqueue_once("app.tasks.summarization.generate_summary_task", meeting_id, "summarize", meeting_id)
     return {"status": "summarization_started", "meeting_id": meeting_id, "task_id": str(task.id)}
 
 
@@ -235,5 +416,5 @@ async def transcribe_from_url(meeting_id: int, source_url: str = Form(...), db:
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
 
-    task = transcribe_audio_from_url_task.delay(meeting_id, source_url)
+    task = enqueue_once(transcribe_audio_from_url_task, meeting_id, "transcribe", meeting_id, source_url)
     return {"status": "transcription_started", "meeting_id": meeting_id, "task_id": str(task.id)}
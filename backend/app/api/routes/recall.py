@@ -7,32 +7,41 @@ import redis
 from app.database import get_db
 from app.config import settings
 from app.models.meeting import Meeting
-from app.tasks.transcription import transcribe_audio_task, transcribe_audio_from_url_task
+from app.tasks.dedup import enqueue_once
+from app.tasks.ingest import ingest_recording_task
+from app.tasks.transcription import transcribe_audio_from_url_task
 from app.services.recall import recall_service
-from app.services.transcription import download_audio
 
 
 router = APIRouter()
 
-
- 
+# Recall events after which the recording can be downloaded; status updates are ignored
+RECORDING_READY_EVENTS = {"bot.done", "recording.done"}
 
 
 @router.post("/webhook")
 async def recall_webhook(request: Request, db: AsyncSession = Depends(get_db)):
-    body = await request.body()
+    """Accept a Recall event and hand it to the ingest stage.
+
+    Only cheap lookups happen here; resolving recordings, downloading and
+    transcribing run in ingest_recording_task so Recall gets an answer
+    before its webhook timeout.
+    """
     try:
         payload = await request.json()
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON")
 
+    event = payload.get("event")
+    if event is not None and event not in RECORDING_READY_EVENTS:
+        return {"status": "ignored"}
+
     meeting_id = (
         payload.get("external_id")
         or (payload.get("metadata") or {}).get("meeting_id")
         or payload.get("meeting_id")
     )
 
-    event = payload.get("event")
     data_obj = payload.get("data") or {}
     bot_info = data_obj.get("bot") or payload.get("bot") or {}
     recording_info = data_obj.get("recording") or payload.get("recording") or {}
@@ -47,22 +56,20 @@ async def recall_webhook(request: Request, db: AsyncSession = Depends(get_db)):
                 meeting_id = mapped.decode("utf-8")
         except Exception:
             pass
-    if not meeting_id and bot_id:
+    if not meeting_id and not bot_id:
+        return {"status": "ignored"}
+
+    meeting_id_int = None
+    if meeting_id:
         try:
-            bot_data = await recall_service.get_bot(str(bot_id))
-            meeting_id = (
-                bot_data.get("external_id")
-                or (bot_data.get("metadata") or {}).get("meeting_id")
-            )
+            meeting_id_int = int(str(meeting_id))
         except Exception:
-            pass
-    if not meeting_id:
-        return {"status": "ignored"}
+            return {"status": "ignored"}
 
-    try:
-        meeting_id_int = int(str(meeting_id))
-    except Exception:
-        return {"status": "ignored"}
+        from sqlalchemy import select as sql_select
+        result = await db.execute(sql_select(Meeting.id).where(Meeting.id == meeting_id_int))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Meeting not found")
 
     audio_url = None
     recordings = payload.get("recordings") or []
@@ -87,59 +94,22 @@ async def recall_webhook(request: Request, db: AsyncSession = Depends(get_db)):
                 break
     if not audio_url:
         audio_url = payload.get("audio_url") or payload.get("download_url")
-
-    if not audio_url and bot_id:
-        # Use the proper Recall API to get audio from bot's media_shortcuts
-        try:
-            audio_url = await recall_service.get_bot_audio_url(str(bot_id))
-        except Exception:
-            pass
-
-    if not audio_url and recording_id:
-        # Fallback: try to get from recording endpoint
-        try:
-            rec_data = await recall_service.get_recording(str(recording_id))
-            url = _extract_download_url(rec_data)
-            if url:
-                audio_url = url
-        except Exception:
-            pass
-
-    if not audio_url:
+    if event is None and not audio_url:
+        # Not a Recall event and nothing to fetch
         return {"status": "ignored"}
 
-    from sqlalchemy import select as sql_select
-    result = await db.execute(sql_select(Meeting).where(Meeting.id == meeting_id_int))
-    meeting = result.scalar_one_or_none()
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-
-    task_id = None
-    if audio_url:
-        try:
-            file_path = await download_audio(audio_url, meeting_id_int)
-            meeting.audio_file_path = file_path
-            meeting.audio_url = audio_url
-            meeting.status = "recording_completed"
-            await db.flush()
-            await db.commit()
-            task = transcribe_audio_task.delay(meeting_id_int)
-            task_id = str(task.id)
-        except Exception:
-            meeting.audio_url = audio_url
-            meeting.status = "recording_completed"
-            await db.flush()
-            await db.commit()
-            task = transcribe_audio_from_url_task.delay(meeting_id_int, audio_url, recording_id)
-            task_id = str(task.id)
+    args = (
+        meeting_id_int,
+        audio_url,
+        str(bot_id) if bot_id else None,
+        str(recording_id) if recording_id else None,
+    )
+    if meeting_id_int is not None:
+        # Recall retries webhooks; a redelivery attaches to the ingest already under way
+        task = enqueue_once(ingest_recording_task, meeting_id_int, "ingest", *args)
     else:
-        meeting.status = "recording_completed"
-        await db.flush()
-        await db.commit()
-        task = transcribe_audio_task.delay(meeting_id_int)
-        task_id = str(task.id)
-
-    return {"status": "accepted", "meeting_id": meeting_id_int, "task_id": task_id}
+        task = ingest_recording_task.delay(*args)
+    return {"status": "accepted", "meeting_id": meeting_id_int, "task_id": str(task.id)}
 
 
 @router.get("/bot/{bot_id}")
@@ -239,5 +209,5 @@ async def ingest_recording(request: IngestRecordingRequest, db: AsyncSession = D
     await db.flush()
     await db.commit()
 
-    task = transcribe_audio_from_url_task.delay(meeting_id, download_url, request.recording_id)
+    task = enqueue_once(transcribe_audio_from_url_task, meeting_id, "transcribe", meeting_id, download_url, request.recording_id)
     return {"status": "accepted", "meeting_id": meeting_id, "task_id": str(task.id)}
\ No newline at end of file
@@ -1,15 +1,26 @@
 """Routes for managing streaming transcription and Zoom bot."""
 
-from fastapi import APIRouter, Depends, HTTPException, WebSocket
-from sqlalchemy import select
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, Depends, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.database import get_db
+from app.config import settings
+from app.database import async_session, get_db
 from app.models.meeting import Meeting
 from app.tasks.zoom_bot import start_zoom_bot_task, stop_zoom_bot_task
-from app.services.streaming_transcription import streaming_transcription_service
-from app.tasks.zoom_bot import save_transcript_segment_task
+from app.services.audio_ingest import AudioIngestQueue, live_ingest
+from app.services.live_events import publish_partial, publish_status, subscribe
+from app.services.segment_writer import SegmentBuffer
+from app.services.streaming_transcription import StreamingTranscriptionService
+from app.tasks.zoom_bot import materialize_transcript_task
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -137,23 +148,146 @@ async def get_meeting_status(meeting_id: int, db: AsyncSession = Depends(get_db)
         raise HTTPException(status_code=500, detail=f"Failed to get meeting status: {str(e)}")
 
 
+@router.get("/ingest/metrics")
+async def get_ingest_metrics():
+    """Lag and drop counters for live audio ingest connections in this process.
+
+    Returns:
+        One entry per streaming meeting
+    """
+    return {"meetings": [q.snapshot() for q in live_ingest.values()]}
+
+
+async def _set_streaming(meeting_id: int, is_streaming: bool):
+    """Mark whether live audio is arriving, so event subscribers know to wait for more."""
+    try:
+        async with async_session() as session:
+            await session.execute(
+                update(Meeting).where(Meeting.id == meeting_id).values(is_streaming=is_streaming)
+            )
+            await session.commit()
+    except Exception as e:
+        logger.warning(f"Failed to set is_streaming={is_streaming} for meeting {meeting_id}: {e}")
+
+
 @router.websocket("/ingest/{meeting_id}")
 async def ingest_audio(websocket: WebSocket, meeting_id: int):
+    """Receive 16 kHz mono PCM16 frames and transcribe them live.
+
+    While connected, the server sends JSON text frames of the form
+    {"type": "flow_control", "lag_ms": ..., ...} so the sender can see how far
+    transcription is behind; the final text frame is the full transcript.
+    """
     await websocket.accept()
 
-    async def audio_stream():
+    service = StreamingTranscriptionService()
+    queue = AudioIngestQueue(meeting_id, service)
+    live_ingest[meeting_id] = queue
+    segments = SegmentBuffer(meeting_id)
+    await _set_streaming(meeting_id, True)
+
+    async def receive_audio():
+        try:
+            while True:
+                data = await websocket.receive_bytes()
+                await queue.put(data)
+        except Exception:
+            pass
+        finally:
+            await queue.close()
+
+    async def report_flow():
+        interval = settings.ingest_flow_interval_ms / 1000
         while True:
+            await asyncio.sleep(interval)
+            stats = queue.snapshot()
+            if stats["lag_ms"] >= settings.ingest_lag_alert_ms:
+                logger.warning(f"Meeting {meeting_id}: ingest lag {stats['lag_ms']} ms ({stats['policy']})")
             try:
-                data = await websocket.receive_bytes()
+                await websocket.send_json({"type": "flow_control", **stats})
             except Exception:
-                break
-            yield data
+                return
 
     async def on_transcript(text: str, metadata: dict):
-        save_transcript_segment_task.delay(meeting_id, text, metadata.get("timestamp", ""), metadata.get("confidence", 0.0))
+        await segments.add(
+            text,
+            start_ms=metadata.get("start_ms"),
+            end_ms=metadata.get("end_ms"),
+            confidence=metadata.get("confidence"),
+            speaker=metadata.get("speaker"),
+        )
+
+    async def on_partial(text: str, metadata: dict):
+        try:
+            await publish_partial(meeting_id, text, metadata)
+        except Exception:
+            pass
 
+    receiver = asyncio.create_task(receive_audio())
+    reporter = asyncio.create_task(report_flow())
     try:
-        full_text = await streaming_transcription_service.transcribe_stream(audio_stream(), on_transcript)
+        full_text = await service.transcribe_stream(queue.stream(), on_transcript, on_partial=on_partial)
+        reporter.cancel()
         await websocket.send_text(full_text)
     finally:
+        receiver.cancel()
+        reporter.cancel()
+        if live_ingest.get(meeting_id) is queue:
+            del live_ingest[meeting_id]
+        await segments.close()
+        await _set_streaming(meeting_id, False)
+        materialize_transcript_task.delay(meeting_id)
+        try:
+            await publish_status(meeting_id, "streaming_ended")
+        except Exception:
+            pass
         await websocket.close()
+
+
+@router.get("/meetings/{meeting_id}/events")
+async def stream_meeting_events(
+    meeting_id: int,
+    after: int = -1,
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+):
+    """Server-sent events with live transcript segments for a meeting.
+
+    Each final segment is sent with its seq as the SSE id, so a reconnecting
+    EventSource resumes after the last segment it received. `after` does the
+    same for clients that track the offset themselves. Rolling summary updates
+    arrive as {"type": "summary"} events.
+
+    Args:
+        meeting_id: Database meeting ID
+        after: Only send segments with a greater seq
+        last_event_id: Set by the browser on reconnect
+    """
+    if last_event_id and last_event_id.lstrip("-").isdigit():
+        after = max(after, int(last_event_id))
+
+    async def events():
+        async for event in subscribe(meeting_id, after):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            prefix = f"id: {event['data']['seq']}\n" if event["type"] == "transcript" else ""
+            yield f"{prefix}data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/meetings/{meeting_id}/ws")
+async def meeting_events_ws(websocket: WebSocket, meeting_id: int, after: int = -1):
+    """WebSocket variant of the live transcript feed; same events as the SSE endpoint."""
+    await websocket.accept()
+    try:
+        async for event in subscribe(meeting_id, after):
+            # Idle proxies close quiet sockets, so answer heartbeats with a keepalive frame
+            await websocket.send_json(event if event is not None else {"type": "keepalive"})
+    except WebSocketDisconnect:
+        return
+    await websocket.close()
@@ -1,12 +1,27 @@
+import logging
+import os
+import time
+
 from celery import Celery
+from celery.signals import celeryd_after_setup, worker_process_init
+from kombu import Queue
 
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+TRANSCRIBE_QUEUE = "transcribe"
+# transcribe: CPU-bound Whisper; ingest: recording downloads; llm: OpenRouter calls;
+# io: Zoom/Recall/email API calls; realtime: live transcript segment saves;
+# recording: long-running zoomrec containers
+WORKER_QUEUES = (TRANSCRIBE_QUEUE, "ingest", "llm", "io", "realtime", "recording")
+
 celery_app = Celery(
     "meeting_summarizer",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
     include=[
+        "app.tasks.ingest",
         "app.tasks.transcription",
         "app.tasks.summarization",
         "app.tasks.email",
@@ -21,4 +36,81 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    task_queues=[Queue(name) for name in WORKER_QUEUES],
+    task_default_queue="io",
+    task_routes={
+        "app.tasks.ingest.*": {"queue": "ingest"},
+        "app.tasks.transcription.*": {"queue": TRANSCRIBE_QUEUE},
+        "app.tasks.summarization.*": {"queue": "llm"},
+        "app.tasks.email.*": {"queue": "io"},
+        "app.tasks.zoom_bot.save_transcript_segment_task": {"queue": "realtime"},
+        "app.tasks.zoom_bot.materialize_transcript_task": {"queue": "realtime"},
+        "app.tasks.zoom_bot.*": {"queue": "io"},
+        "app.tasks.zoomrec.*": {"queue": "recording"},
+    },
 )
+
+if settings.whisper_preload:
+    # Children only report "up" after worker_process_init returns; model loading can take a while
+    celery_app.conf.worker_proc_alive_timeout = settings.whisper_preload_timeout
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        import resource
+
+        # Peak rather than current RSS, but still useful on platforms without /proc
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _preload_transcription_backend(role: str):
+    from app.services.transcription import get_transcription_backend
+
+    started = time.perf_counter()
+    get_transcription_backend()
+    logger.info(
+        "%s pid=%s: %s model '%s' ready in %.2fs, rss=%.0f MiB",
+        role,
+        os.getpid(),
+        settings.transcription_backend,
+        settings.whisper_model,
+        time.perf_counter() - started,
+        _rss_mb(),
+    )
+
+
+_preload_in_children = False
+
+
+@celeryd_after_setup.connect
+def preload_model_in_parent(sender=None, instance=None, **kwargs):
+    global _preload_in_children
+    # Runs after -Q is applied but before the pool forks; no -Q means every queue
+    consume_from = instance.app.amqp.queues.consume_from if instance is not None else None
+    _preload_in_children = settings.whisper_preload and (
+        not consume_from or TRANSCRIBE_QUEUE in consume_from
+    )
+    # Only the PyTorch backend is safe to fork after loading; CTranslate2 must load per child
+    if (
+        _preload_in_children
+        and settings.whisper_share_weights
+        and settings.transcription_backend == "openai-whisper"
+    ):
+        _preload_transcription_backend("worker parent")
+
+
+@worker_process_init.connect
+def reset_db_pool_in_child(**kwargs):
+    from app.database import dispose_sync_engine
+
+    dispose_sync_engine()
+
+
+@worker_process_init.connect
+def preload_model_in_child(**kwargs):
+    if _preload_in_children:
+        _preload_transcription_backend("worker child")
@@ -1,9 +1,13 @@
 #!/usr/bin/env python
 """CLI commands for running the application."""
 
+import signal
+import subprocess
 import sys
+import time
 import uvicorn
-from app.celery_app import celery_app
+from app.celery_app import celery_app, WORKER_QUEUES
+from app.config import settings
 
 
 def run_server():
@@ -16,24 +20,88 @@ def run_server():
     )
 
 
-def run_worker():
-    """Start the Celery worker."""
-    celery_app.worker_main([
-        "worker",
-        "--loglevel=info",
-    ])
+def run_worker(queues: list[str] | None = None):
+    """Start Celery workers for the given queues (default: all).
+
+    Each queue gets its own worker so it has its own concurrency, prefetch and
+    pool settings, and a long transcription can't occupy slots meant for other
+    work. Prefork children are daemonic: tasks running in them must not start
+    processes of their own (transcription parallelizes on threads).
+    """
+    queues = queues or list(WORKER_QUEUES)
+    unknown = [q for q in queues if q not in WORKER_QUEUES]
+    if unknown:
+        print(f"Unknown queue(s): {', '.join(unknown)}. Available: {', '.join(WORKER_QUEUES)}")
+        sys.exit(1)
+
+    if len(queues) == 1:
+        queue = queues[0]
+        celery_app.worker_main([
+            "worker",
+            "--loglevel=info",
+            f"--queues={queue}",
+            f"--hostname={queue}@%h",
+            f"--concurrency={settings.queue_concurrency.get(queue, 1)}",
+            f"--prefetch-multiplier={settings.queue_prefetch_multiplier.get(queue, 1)}",
+            f"--pool={settings.queue_pool.get(queue, 'prefork')}",
+        ])
+        return
+
+    _supervise_workers(queues)
+
+
+def _supervise_workers(queues: list[str]):
+    """Run one worker process per queue until any of them exits.
+
+    SIGTERM/SIGINT are forwarded so every worker gets Celery's warm shutdown.
+    If a worker dies on its own (e.g. OOM-killed) the rest are stopped and the
+    command exits non-zero, so the container's restart policy brings the whole
+    set back instead of leaving that queue unconsumed.
+    """
+    processes: dict[str, subprocess.Popen] = {}
+    signalled = False
+
+    def forward(signum, _frame):
+        nonlocal signalled
+        signalled = True
+        stop(signum)
+
+    def stop(signum=signal.SIGTERM):
+        for p in processes.values():
+            if p.poll() is None:
+                p.send_signal(signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for queue in queues:
+        # Own session: a terminal Ctrl+C reaches only this process, which forwards it once
+        processes[queue] = subprocess.Popen([sys.executable, "-m", "app.cli", "worker", queue], start_new_session=True)
+    if signalled:
+        stop()
+
+    while all(p.poll() is None for p in processes.values()):
+        time.sleep(1)
+    if not signalled:
+        dead = [f"{q} ({p.returncode})" for q, p in processes.items() if p.returncode is not None]
+        print(f"Worker exited: {', '.join(dead)}; stopping the others")
+        stop()
+    for p in processes.values():
+        p.wait()
+
+    clean = signalled and all(p.returncode == 0 for p in processes.values())
+    sys.exit(0 if clean else 1)
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: cli.py [server|worker]")
+        print("Usage: cli.py [server|worker [queue,...]]")
         sys.exit(1)
 
     command = sys.argv[1]
     if command == "server":
         run_server()
     elif command == "worker":
-        run_worker()
+        run_worker(sys.argv[2].split(",") if len(sys.argv) > 2 else None)
     else:
         print(f"Unknown command: {command}")
         sys.exit(1)
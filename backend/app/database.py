@@ -1,11 +1,23 @@
+from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.config import settings
 
 engine = create_async_engine(settings.database_url, echo=False)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Process-wide pool for sync code (Celery tasks, agent tools). Forked workers must
+# call dispose_sync_engine() so children don't reuse the parent's connections.
+sync_engine = create_engine(
+    settings.database_url.replace("+asyncpg", ""),
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
+)
+SyncSession = sessionmaker(bind=sync_engine)
+
 
 class Base(DeclarativeBase):
     pass
@@ -14,3 +26,12 @@ class Base(DeclarativeBase):
 async def get_db():
     async with async_session() as session:
         yield session
+
+
+def get_sync_session() -> Session:
+    return SyncSession()
+
+
+def dispose_sync_engine():
+    # close=False leaves the parent's sockets alone and just drops them from this process's pool
+    sync_engine.dispose(close=False)
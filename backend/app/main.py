@@ -1,8 +1,19 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import meetings, chat, zoom, streaming, recall, twins
+from app.services.recall import recall_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await recall_service.open()
+    yield
+    await recall_service.close()
+
 
-app = FastAPI(title="Meeting Notes Summarizer", version="1.0.0")
+app = FastAPI(title="Meeting Notes Summarizer", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,6 +21,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(meetings.router, prefix="/meetings", tags=["meetings"])
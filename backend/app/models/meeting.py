@@ -1,5 +1,6 @@
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import String, Text, DateTime, Float, ForeignKey, Index, JSON, UniqueConstraint, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -7,6 +8,11 @@ from app.database import Base
 
 class Meeting(Base):
     __tablename__ = "meetings"
+    __table_args__ = (
+        # Keyset pagination of the meeting list
+        Index("ix_meetings_created_at_id", "created_at", "id"),
+        Index("ix_meetings_zoom_meeting_uuid", "zoom_meeting_uuid"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(255))
@@ -31,31 +37,77 @@ class Meeting(Base):
 
 class Transcript(Base):
     __tablename__ = "transcripts"
+    __table_args__ = (UniqueConstraint("meeting_id", name="uq_transcripts_meeting_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     meeting_id: Mapped[int] = mapped_column(ForeignKey("meetings.id"))
-    text: Mapped[str] = mapped_column(Text)
-    segments: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Megabytes for long meetings; only loaded when accessed or undeferred
+    text: Mapped[str] = mapped_column(Text, deferred=True)
+    segments: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     meeting: Mapped["Meeting"] = relationship(back_populates="transcript")
 
 
+class TranscriptSegment(Base):
+    """One transcript segment, live or from batch transcription.
+
+    Live segments are appended as they arrive and Transcript.text is
+    materialized from them; batch transcription rewrites a meeting's rows.
+    """
+
+    __tablename__ = "transcript_segments"
+    __table_args__ = (
+        UniqueConstraint("meeting_id", "seq", name="uq_transcript_segments_meeting_id_seq"),
+        # Time-range reads (/meetings/{id}/segments)
+        Index("ix_transcript_segments_meeting_id_start_ms", "meeting_id", "start_ms"),
+        Index("ix_transcript_segments_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    meeting_id: Mapped[int] = mapped_column(ForeignKey("meetings.id"))
+    seq: Mapped[int] = mapped_column()
+    text: Mapped[str] = mapped_column(Text)
+    start_ms: Mapped[int | None] = mapped_column(nullable=True)
+    end_ms: Mapped[int | None] = mapped_column(nullable=True)
+    speaker: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Maintained by Postgres for full-text search (app.services.search)
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', coalesce(text, ''))", persisted=True), deferred=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class Summary(Base):
     __tablename__ = "summaries"
+    __table_args__ = (
+        UniqueConstraint("meeting_id", name="uq_summaries_meeting_id"),
+        Index("ix_summaries_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     meeting_id: Mapped[int] = mapped_column(ForeignKey("meetings.id"))
     text: Mapped[str] = mapped_column(Text)
     action_items: Mapped[list | None] = mapped_column(JSON, nullable=True)
     decisions: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    # Rolling summary of a live meeting: {"last_seq", "updated_at", "final"}
+    rolling_state: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', coalesce(text, ''))", persisted=True), deferred=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     meeting: Mapped["Meeting"] = relationship(back_populates="summary")
 
+    @property
+    def is_live(self) -> bool:
+        return bool(self.rolling_state) and not self.rolling_state.get("final")
+
 
 class Participant(Base):
     __tablename__ = "participants"
+    __table_args__ = (Index("ix_participants_meeting_id", "meeting_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     meeting_id: Mapped[int] = mapped_column(ForeignKey("meetings.id"))
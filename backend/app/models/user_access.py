@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy import String, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -7,6 +7,11 @@ from app.database import Base
 
 class UserAccess(Base):
     __tablename__ = "user_access"
+    __table_args__ = (
+        # Also serves lookups by pubkey alone
+        UniqueConstraint("pubkey", "meeting_id", name="uq_user_access_pubkey_meeting_id"),
+        Index("ix_user_access_meeting", "meeting_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     pubkey: Mapped[str] = mapped_column(String(255))
@@ -32,6 +32,30 @@ class TranscriptResponse(BaseModel):
         from_attributes = True
 
 
+class SegmentResponse(BaseModel):
+    """One transcript segment; times are seconds from the start of the meeting."""
+
+    seq: int
+    start: float | None = None
+    end: float | None = None
+    speaker: str | None = None
+    text: str
+    confidence: float | None = None
+
+
+class SearchHit(BaseModel):
+    kind: str  # "segment" or "summary"
+    meeting_id: int
+    title: str
+    date: datetime
+    seq: int | None = None
+    start: float | None = None  # seconds, segment hits only
+    end: float | None = None
+    speaker: str | None = None
+    snippet: str  # HTML: escaped text with matches in <mark> tags
+    rank: float
+
+
 class ActionItem(BaseModel):
     task: str
     assignee: str | None = None
@@ -43,6 +67,7 @@ class SummaryResponse(BaseModel):
     text: str
     action_items: list[ActionItem] | None = None
     decisions: list[str] | None = None
+    is_live: bool = False
     created_at: datetime
 
     class Config:
@@ -0,0 +1,164 @@
+"""Bounded per-connection audio queue with backpressure for live ingest."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncGenerator, Optional
+
+from app.config import settings
+from app.services.streaming_transcription import AudioGap, StreamingTranscriptionService, preload_model
+from app.services.transcription import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_SAMPLE = 2  # 16 kHz mono PCM16
+BYTES_PER_MS = SAMPLE_RATE * BYTES_PER_SAMPLE // 1000
+
+POLICIES = ("block", "drop_oldest", "degrade")
+
+# meeting_id -> queue of the live connection in this process, for lag metrics
+live_ingest: dict[int, "AudioIngestQueue"] = {}
+
+
+class AudioIngestQueue:
+    """Audio waiting for the transcription engine, bounded by duration.
+
+    When the queue is full:
+      block: the sender's next frame isn't read until there is room, so TCP
+             flow control slows the client down.
+      drop_oldest: the oldest queued audio is discarded to stay near real time.
+                   The engine gets an AudioGap in its place so timestamps keep
+                   following meeting time.
+      degrade: the engine is switched to `ingest_fallback_model` (loaded when
+               the connection opens) while lag is high; audio is still dropped
+               at the hard limit.
+    """
+
+    def __init__(
+        self,
+        meeting_id: int,
+        service: StreamingTranscriptionService,
+        policy: Optional[str] = None,
+        max_ms: Optional[int] = None,
+    ):
+        self.meeting_id = meeting_id
+        self.service = service
+        self.primary_model = service.model
+        self.policy = policy or settings.ingest_backpressure_policy
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy '{self.policy}', expected one of: {', '.join(POLICIES)}")
+        self.max_bytes = (max_ms or settings.ingest_max_queue_ms) * BYTES_PER_MS
+
+        self._chunks: deque[bytes] = deque()
+        self._bytes = 0
+        self._gap_bytes = 0  # dropped since the last chunk handed to the engine
+        self._cond = asyncio.Condition()
+        self._closed = False
+
+        self.received_bytes = 0
+        self.dropped_bytes = 0
+        self.blocked_seconds = 0.0
+        self.degraded = False
+        self.started_at = time.monotonic()
+
+        self._fallback_loaded = False
+        self._preload_task: Optional[asyncio.Task] = None
+        if self.policy == "degrade":
+            self._preload_task = asyncio.create_task(self._preload_fallback())
+
+    async def _preload_fallback(self):
+        # Loading it on first use would stall the decode thread just when the stream is behind
+        try:
+            await preload_model(settings.ingest_fallback_model)
+            self._fallback_loaded = True
+        except Exception as e:
+            logger.warning(f"Meeting {self.meeting_id}: failed to load fallback model, not degrading: {e}")
+
+    @property
+    def lag_ms(self) -> int:
+        return self._bytes // BYTES_PER_MS
+
+    async def put(self, chunk: bytes):
+        async with self._cond:
+            self.received_bytes += len(chunk)
+            if self.policy == "block":
+                if self._bytes >= self.max_bytes:
+                    started = time.monotonic()
+                    await self._cond.wait_for(lambda: self._bytes < self.max_bytes or self._closed)
+                    self.blocked_seconds += time.monotonic() - started
+            elif self._bytes + len(chunk) > self.max_bytes:
+                self._drop_oldest(self._bytes + len(chunk) - self.max_bytes)
+            if self._closed:
+                return
+            self._chunks.append(chunk)
+            self._bytes += len(chunk)
+            self._cond.notify_all()
+
+    def _drop_oldest(self, count: int):
+        """Discard at least `count` queued bytes from the front, in whole samples."""
+        count += -count % BYTES_PER_SAMPLE
+        count = min(count, self._bytes - self._bytes % BYTES_PER_SAMPLE)
+        dropped = 0
+        while dropped < count:
+            old = self._chunks.popleft()
+            take = min(len(old), count - dropped)
+            if take < len(old):
+                self._chunks.appendleft(old[take:])
+            dropped += take
+        self._bytes -= dropped
+        self.dropped_bytes += dropped
+        self._gap_bytes += dropped
+
+    async def get(self) -> Optional[bytes | AudioGap]:
+        """Next chunk (or gap left by dropped audio), or None once the queue is closed and drained."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._chunks or self._gap_bytes or self._closed)
+            if self._gap_bytes:
+                gap, self._gap_bytes = AudioGap(self._gap_bytes // BYTES_PER_SAMPLE), 0
+                return gap
+            if not self._chunks:
+                return None
+            chunk = self._chunks.popleft()
+            self._bytes -= len(chunk)
+            self._cond.notify_all()
+        if self.policy == "degrade":
+            self._adjust_model()
+        return chunk
+
+    def _adjust_model(self):
+        lag = self.lag_ms
+        if not self.degraded and lag >= settings.ingest_degrade_lag_ms and self._fallback_loaded:
+            self.degraded = True
+            self.service.model = settings.ingest_fallback_model
+            logger.warning(f"Meeting {self.meeting_id}: ingest lag {lag} ms, degrading to '{self.service.model}'")
+        elif self.degraded and lag <= settings.ingest_degrade_lag_ms // 4:
+            self.degraded = False
+            self.service.model = self.primary_model
+            logger.info(f"Meeting {self.meeting_id}: ingest caught up, back to '{self.service.model}'")
+
+    async def stream(self) -> AsyncGenerator[bytes | AudioGap, None]:
+        while True:
+            chunk = await self.get()
+            if chunk is None:
+                return
+            yield chunk
+
+    async def close(self):
+        async with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        return {
+            "meeting_id": self.meeting_id,
+            "policy": self.policy,
+            "model": self.service.model,
+            "degraded": self.degraded,
+            "lag_ms": self.lag_ms,
+            "max_lag_ms": self.max_bytes // BYTES_PER_MS,
+            "received_ms": self.received_bytes // BYTES_PER_MS,
+            "dropped_ms": self.dropped_bytes // BYTES_PER_MS,
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "connected_seconds": round(time.monotonic() - self.started_at, 3),
+        }
@@ -0,0 +1,296 @@
+"""Resumable HTTP downloads using parallel Range requests."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+import aiohttp
+from yarl import URL
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses S3/Recall return for an expired pre-signed URL or rejected auth
+EXPIRED_STATUSES = (400, 401, 403)
+STATE_SAVE_INTERVAL_SECONDS = 1.0
+
+
+class DownloadError(Exception):
+    pass
+
+
+class _UrlExpired(Exception):
+    pass
+
+
+def auth_header_candidates(url: str) -> list[dict]:
+    if "recall.ai" in url.lower() and settings.recall_api_key:
+        return [
+            {"Authorization": f"Token {settings.recall_api_key}"},
+            {"Authorization": settings.recall_api_key},
+        ]
+    if "zoom.us" in url.lower() and settings.zoom_access_token:
+        return [{"Authorization": f"Bearer {settings.zoom_access_token}"}]
+    return [{}]
+
+
+class _Source:
+    """Current URL and auth headers, shared by all parts of a download."""
+
+    def __init__(self, url: str, refresh_url: Optional[Callable[[], Awaitable[Optional[str]]]]):
+        self._refresh_url = refresh_url
+        self._lock = asyncio.Lock()
+        self.generation = 0
+        self._set_url(url)
+
+    def _set_url(self, url: str):
+        self.url = url
+        # encoded=True prevents double-encoding of pre-signed S3 URLs
+        self.request_url = URL(url, encoded=True)
+        self._candidates = auth_header_candidates(url)
+        self.headers = self._candidates[0]
+
+    def try_alternate_auth(self) -> bool:
+        i = self._candidates.index(self.headers)
+        if i + 1 < len(self._candidates):
+            self.headers = self._candidates[i + 1]
+            return True
+        return False
+
+    async def refresh(self, seen_generation: int):
+        """Get a fresh URL, unless another part already did since `seen_generation`."""
+        async with self._lock:
+            if self.generation != seen_generation:
+                return
+            if self._refresh_url is None:
+                raise DownloadError(f"Download URL rejected and no way to refresh it: {self.url}")
+            url = await self._refresh_url()
+            if not url:
+                raise DownloadError("Could not refresh the download URL")
+            logger.info("Refreshed expired download URL")
+            self._set_url(url)
+            self.generation += 1
+
+
+class RangeDownloader:
+    """Downloads `url` to `dest` in parallel byte ranges.
+
+    Progress is kept in `<dest>.part.json` next to `<dest>.part`, so a crashed or
+    retried download continues where it stopped instead of starting over. When
+    a pre-signed URL expires mid-download, `refresh_url` is awaited for a new one.
+    Servers without Range support fall back to a single sequential stream.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        dest: str,
+        refresh_url: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+        on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+        parts: Optional[int] = None,
+    ):
+        self.source = _Source(url, refresh_url)
+        self.dest = dest
+        self.tmp_path = dest + ".part"
+        self.state_path = dest + ".part.json"
+        self.on_progress = on_progress
+        self.parts = max(1, parts or settings.download_parts)
+        self.part_min_bytes = settings.download_part_min_mb * 1024 * 1024
+        self.buffer_bytes = settings.download_buffer_kb * 1024
+        self._state: dict = {}
+        self._last_state_save = 0.0
+        self._writes: set[asyncio.Future] = set()  # pwrite calls still running on a thread
+
+    async def run(self) -> str:
+        os.makedirs(os.path.dirname(self.dest) or ".", exist_ok=True)
+        connector = aiohttp.TCPConnector(limit=self.parts + 1, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            total, etag = await self._probe(session)
+            if total is None:
+                await self._download_sequential(session)
+            else:
+                await self._download_ranges(session, total, etag)
+        os.replace(self.tmp_path, self.dest)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        return self.dest
+
+    async def _probe(self, session: aiohttp.ClientSession) -> tuple[Optional[int], Optional[str]]:
+        """Returns (total size, etag) if the server supports ranges, else (None, None)."""
+        refreshes = 0
+        while True:
+            generation = self.source.generation
+            async with session.get(
+                self.source.request_url, headers={**self.source.headers, "Range": "bytes=0-0"}
+            ) as resp:
+                if resp.status in EXPIRED_STATUSES:
+                    if resp.status != 400 and self.source.try_alternate_auth():
+                        continue
+                    refreshes += 1
+                    if refreshes > settings.download_retries:
+                        raise DownloadError(f"Download URL keeps being rejected: {self.source.url}")
+                    await self.source.refresh(generation)
+                    continue
+                resp.raise_for_status()
+                content_range = resp.headers.get("Content-Range", "")
+                if resp.status != 206 or "/" not in content_range:
+                    return None, None
+                size = content_range.rsplit("/", 1)[1]
+                if not size.isdigit():
+                    return None, None
+                return int(size), resp.headers.get("ETag")
+
+    def _load_state(self, total: int, etag: Optional[str]) -> bool:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get("total") != total or state.get("etag") != etag or not os.path.exists(self.tmp_path):
+            return False
+        self._state = state
+        return True
+
+    def _save_state(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_state_save < STATE_SAVE_INTERVAL_SECONDS:
+            return
+        self._last_state_save = now
+        with open(self.state_path, "w") as f:
+            json.dump(self._state, f)
+
+    def _report(self):
+        if self.on_progress:
+            done = sum(p["done"] for p in self._state["parts"])
+            self.on_progress(done, self._state["total"])
+
+    async def _download_ranges(self, session: aiohttp.ClientSession, total: int, etag: Optional[str]):
+        if self._load_state(total, etag):
+            logger.info(f"Resuming download of {self.dest} at {sum(p['done'] for p in self._state['parts'])}/{total} bytes")
+        else:
+            n = max(1, min(self.parts, total // self.part_min_bytes or 1))
+            size = -(-total // n)
+            self._state = {
+                "total": total,
+                "etag": etag,
+                "parts": [
+                    {"start": i * size, "end": min(total, (i + 1) * size) - 1, "done": 0}
+                    for i in range(n)
+                ],
+            }
+            with open(self.tmp_path, "wb") as f:
+                f.truncate(total)
+            self._save_state(force=True)
+
+        fd = os.open(self.tmp_path, os.O_WRONLY)
+        tasks = [asyncio.create_task(self._fetch_part(session, fd, part)) for part in self._state["parts"]]
+        try:
+            await asyncio.gather(*tasks)
+            await asyncio.to_thread(os.fsync, fd)
+        finally:
+            # When a part fails the others are still running. Stop them and wait for their
+            # writes before closing fd, whose number the next open() may reuse.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, *self._writes, return_exceptions=True)
+            os.close(fd)
+            self._save_state(force=True)
+
+        written = os.path.getsize(self.tmp_path)
+        done = sum(p["done"] for p in self._state["parts"])
+        if written != total or done != total:
+            raise DownloadError(f"Size mismatch for {self.dest}: expected {total} bytes, got {done}")
+
+    async def _fetch_part(self, session: aiohttp.ClientSession, fd: int, part: dict):
+        failures = 0
+        length = part["end"] - part["start"] + 1
+        while part["done"] < length:
+            generation = self.source.generation
+            try:
+                await self._stream_range(session, fd, part)
+                failures = 0
+            except _UrlExpired:
+                failures += 1
+                if failures > settings.download_retries:
+                    raise DownloadError(f"Download URL keeps being rejected: {self.source.url}")
+                await self.source.refresh(generation)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failures += 1
+                if failures > settings.download_retries:
+                    raise
+                logger.warning(f"Range {part['start']}-{part['end']} failed ({e}), retrying")
+                await asyncio.sleep(2 ** failures)
+
+    async def _stream_range(self, session: aiohttp.ClientSession, fd: int, part: dict):
+        offset = part["start"] + part["done"]
+        headers = {**self.source.headers, "Range": f"bytes={offset}-{part['end']}"}
+        etag = self._state.get("etag")
+        if etag and not etag.startswith("W/"):
+            # If the object changed, the server answers 200 with the full body instead
+            headers["If-Range"] = etag
+        async with session.get(self.source.request_url, headers=headers) as resp:
+            if resp.status in EXPIRED_STATUSES:
+                raise _UrlExpired()
+            resp.raise_for_status()
+            if resp.status != 206:
+                raise DownloadError(f"Server ignored the range request for {self.dest}; the object may have changed")
+
+            buf = bytearray()
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                buf += chunk
+                if len(buf) >= self.buffer_bytes:
+                    await self._write(fd, part, buf)
+                    buf = bytearray()
+            if buf:
+                await self._write(fd, part, buf)
+
+    async def _write(self, fd: int, part: dict, data: bytearray):
+        offset = part["start"] + part["done"]
+        # Shielded: cancelling the part can't stop the thread, so the write is tracked until it lands
+        write = asyncio.get_running_loop().run_in_executor(None, os.pwrite, fd, data, offset)
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+        await asyncio.shield(write)
+        part["done"] += len(data)
+        self._save_state()
+        self._report()
+
+    async def _download_sequential(self, session: aiohttp.ClientSession):
+        refreshes = 0
+        while True:
+            generation = self.source.generation
+            async with session.get(self.source.request_url, headers=self.source.headers) as resp:
+                if resp.status in EXPIRED_STATUSES:
+                    if resp.status != 400 and self.source.try_alternate_auth():
+                        continue
+                    refreshes += 1
+                    if refreshes > settings.download_retries:
+                        raise DownloadError(f"Download URL keeps being rejected: {self.source.url}")
+                    await self.source.refresh(generation)
+                    continue
+                resp.raise_for_status()
+                expected = resp.content_length
+                done = 0
+                with open(self.tmp_path, "wb") as f:
+                    buf = bytearray()
+                    async for chunk in resp.content.iter_chunked(64 * 1024):
+                        buf += chunk
+                        if len(buf) >= self.buffer_bytes:
+                            await asyncio.to_thread(f.write, buf)
+                            done += len(buf)
+                            buf = bytearray()
+                            if self.on_progress:
+                                self.on_progress(done, expected)
+                    if buf:
+                        await asyncio.to_thread(f.write, buf)
+                        done += len(buf)
+                        if self.on_progress:
+                            self.on_progress(done, expected)
+                if expected is not None and done != expected:
+                    raise DownloadError(f"Size mismatch for {self.dest}: expected {expected} bytes, got {done}")
+                return
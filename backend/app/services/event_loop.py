@@ -0,0 +1,37 @@
+"""A long-lived event loop per process for running coroutines from sync code.
+
+Celery tasks are sync, and a fresh `asyncio.run` loop per call would throw
+away every pooled keep-alive connection (OpenRouter, Recall) when it closes.
+Coroutines run here instead, on one loop in a daemon thread, so clients bound
+to it stay usable between tasks.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_pid
+    with _loop_lock:
+        # A forked Celery child inherits the object but not the thread running it
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="sync-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """Run a coroutine from sync code on this process's persistent event loop."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def is_persistent(loop: asyncio.AbstractEventLoop) -> bool:
+    """True for the loop run_sync() uses in this process; it lives as long as the process."""
+    return loop is _loop and _loop_pid == os.getpid()
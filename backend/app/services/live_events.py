@@ -0,0 +1,148 @@
+"""Redis pub/sub fan-out of live transcript events.
+
+Final segments carry their `seq` so a reconnecting subscriber can pass the last
+seq it saw and only receive what it missed: the gap is replayed once from
+transcript_segments, then events come from the meeting's Redis channel while
+the meeting is still live.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import AsyncGenerator, Optional
+
+import redis
+import redis.asyncio as aioredis
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import async_session
+from app.models.meeting import Meeting, TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15.0
+
+_redis: Optional[aioredis.Redis] = None
+_sync_redis: Optional[redis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = aioredis.Redis.from_url(settings.redis_url)
+    return _redis
+
+
+def get_sync_redis() -> redis.Redis:
+    """Process-wide client for sync callers (Celery tasks); its pool is reused across calls."""
+    global _sync_redis
+    if _sync_redis is None:
+        _sync_redis = redis.Redis.from_url(settings.redis_url)
+    return _sync_redis
+
+
+def meeting_channel(meeting_id: int) -> str:
+    return f"meeting:{meeting_id}:events"
+
+
+def _segment_event(row: dict) -> dict:
+    return {
+        "type": "transcript",
+        "data": {
+            "seq": row["seq"],
+            "text": row["text"],
+            "start_ms": row.get("start_ms"),
+            "end_ms": row.get("end_ms"),
+            "speaker": row.get("speaker"),
+            "timestamp": row.get("timestamp") or datetime.utcnow().isoformat(),
+        },
+    }
+
+
+async def publish_segments(meeting_id: int, rows: list[dict]):
+    """Publish committed segments (each with its seq) to subscribers."""
+    r = get_redis()
+    async with r.pipeline(transaction=False) as pipe:
+        for row in rows:
+            pipe.publish(meeting_channel(meeting_id), json.dumps(_segment_event(row)))
+        await pipe.execute()
+
+
+async def publish_partial(meeting_id: int, text: str, metadata: dict):
+    """Publish the current unstable hypothesis; partials are never replayed."""
+    event = {"type": "partial", "data": {"text": text, **metadata}}
+    await get_redis().publish(meeting_channel(meeting_id), json.dumps(event))
+
+
+def publish_status_sync(meeting_id: int, status: str):
+    """Publish a status change from sync code (Celery tasks)."""
+    event = {"type": "status", "data": {"status": status}}
+    get_sync_redis().publish(meeting_channel(meeting_id), json.dumps(event))
+
+
+def publish_summary_sync(meeting_id: int, notes: dict, final: bool = False):
+    """Publish the updated rolling summary of a live meeting."""
+    event = {"type": "summary", "data": {**notes, "final": final}}
+    get_sync_redis().publish(meeting_channel(meeting_id), json.dumps(event))
+
+
+async def publish_status(meeting_id: int, status: str):
+    event = {"type": "status", "data": {"status": status}}
+    await get_redis().publish(meeting_channel(meeting_id), json.dumps(event))
+
+
+async def subscribe(meeting_id: int, after: int = -1) -> AsyncGenerator[Optional[dict], None]:
+    """Yield events for a meeting, starting with final segments after `after`.
+
+    Yields None every HEARTBEAT_SECONDS without traffic so callers can keep
+    idle connections alive. Ends after a "streaming_ended" status event, or
+    right after the replay if the meeting isn't streaming, since no further
+    events would arrive.
+    """
+    pubsub = get_redis().pubsub()
+    # Subscribe before replaying so segments committed in between aren't lost
+    await pubsub.subscribe(meeting_channel(meeting_id))
+    try:
+        last_seq = after
+        async with async_session() as session:
+            result = await session.execute(
+                select(TranscriptSegment)
+                .where(TranscriptSegment.meeting_id == meeting_id, TranscriptSegment.seq > after)
+                .order_by(TranscriptSegment.seq)
+            )
+            missed = result.scalars().all()
+            live = await session.scalar(select(Meeting.is_streaming).where(Meeting.id == meeting_id))
+        for seg in missed:
+            yield _segment_event({
+                "seq": seg.seq,
+                "text": seg.text,
+                "start_ms": seg.start_ms,
+                "end_ms": seg.end_ms,
+                "speaker": seg.speaker,
+                "timestamp": seg.created_at.isoformat() if seg.created_at else None,
+            })
+            last_seq = seg.seq
+        if not live:
+            return
+
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=HEARTBEAT_SECONDS)
+            if message is None:
+                yield None
+                continue
+            try:
+                event = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            if event.get("type") == "transcript":
+                seq = event["data"]["seq"]
+                if seq <= last_seq:
+                    continue
+                last_seq = seq
+            yield event
+            if event.get("type") == "status" and event["data"].get("status") == "streaming_ended":
+                return
+    finally:
+        await pubsub.unsubscribe(meeting_channel(meeting_id))
+        await pubsub.aclose()
@@ -0,0 +1,31 @@
+"""Process-wide LLM clients.
+
+ChatBot instances hold the provider's HTTP client, so they are created once per
+model and process and shared by every call. Sync code (Celery tasks) runs its
+LLM coroutines with app.services.event_loop.run_sync, so pooled keep-alive
+connections to OpenRouter stay usable between tasks.
+"""
+
+import threading
+
+from spoon_ai.chat import ChatBot
+
+from app.config import settings
+
+_llms: dict[str, ChatBot] = {}
+_llms_lock = threading.Lock()
+
+
+def get_llm(model_name: str) -> ChatBot:
+    llm = _llms.get(model_name)
+    if llm is None:
+        with _llms_lock:
+            llm = _llms.get(model_name)
+            if llm is None:
+                llm = ChatBot(
+                    model_name=model_name,
+                    llm_provider="openrouter",
+                    llm_api_key=settings.openrouter_api_key,
+                )
+                _llms[model_name] = llm
+    return llm
@@ -0,0 +1,134 @@
+"""Redis cache for LLM answers.
+
+Keys hash the model, the normalized prompt and a data version. Versions are
+counters bumped when the data behind an answer changes: `transcript:<id>` when
+a meeting's transcript is rewritten (meeting summaries), `all` on any
+transcript or summary change (chat answers, which can touch every meeting).
+Bumping a version orphans the old entries, which then age out by TTL or get
+evicted least-recently-used once the cache holds llm_cache_max_entries.
+Hits and misses are counted per kind in a Redis hash.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Optional
+
+import redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "llm:cache"
+INDEX_KEY = f"{PREFIX}:index"  # zset of entry keys scored by last use
+STATS_KEY = f"{PREFIX}:stats"
+
+_redis: Optional[redis.Redis] = None
+
+
+def _client() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.redis_url)
+    return _redis
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.casefold().split())
+
+
+def data_version(scope: str) -> int:
+    try:
+        value = _client().get(f"llm:version:{scope}")
+    except redis.RedisError:
+        return 0
+    return int(value) if value else 0
+
+
+def _bump(*scopes: str):
+    try:
+        pipe = _client().pipeline(transaction=False)
+        for scope in scopes:
+            pipe.incr(f"llm:version:{scope}")
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to bump LLM cache version for {scopes}: {e}")
+
+
+def invalidate_transcript(meeting_id: int):
+    """Call after a meeting's transcript changed; drops its cached summary and chat answers."""
+    _bump(f"transcript:{meeting_id}", "all")
+
+
+def invalidate_summaries():
+    _bump("all")
+
+
+def _key(kind: str, model: str, prompt: str, version: int) -> str:
+    digest = hashlib.sha256(f"{model}\0{version}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+    return f"{PREFIX}:{kind}:{digest}"
+
+
+def lookup(kind: str, model: str, prompt: str, version: int = 0) -> Optional[Any]:
+    if not settings.llm_cache_enabled:
+        return None
+    key = _key(kind, model, prompt, version)
+    try:
+        r = _client()
+        raw = r.get(key)
+        pipe = r.pipeline(transaction=False)
+        pipe.hincrby(STATS_KEY, f"{kind}:{'hits' if raw else 'misses'}", 1)
+        if raw:
+            pipe.zadd(INDEX_KEY, {key: time.time()})
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"LLM cache read failed: {e}")
+        return None
+    return json.loads(raw) if raw else None
+
+
+def store(kind: str, model: str, prompt: str, value: Any, version: int = 0, ttl: Optional[int] = None):
+    if not settings.llm_cache_enabled:
+        return
+    payload = json.dumps(value)
+    if len(payload) > settings.llm_cache_max_value_kb * 1024:
+        return
+    key = _key(kind, model, prompt, version)
+    now = time.time()
+    ttl = ttl or settings.llm_cache_ttl
+    try:
+        r = _client()
+        pipe = r.pipeline(transaction=False)
+        pipe.set(key, payload, ex=ttl)
+        pipe.zadd(INDEX_KEY, {key: now})
+        # Index entries older than the longest TTL point at expired keys
+        pipe.zremrangebyscore(INDEX_KEY, 0, now - settings.llm_cache_ttl)
+        pipe.zcard(INDEX_KEY)
+        size = pipe.execute()[-1]
+        excess = size - settings.llm_cache_max_entries
+        if excess > 0:
+            evicted = [k for k, _ in r.zpopmin(INDEX_KEY, excess)]
+            if evicted:
+                r.delete(*evicted)
+    except redis.RedisError as e:
+        logger.warning(f"LLM cache write failed: {e}")
+
+
+def stats() -> dict:
+    try:
+        r = _client()
+        counts = {k.decode(): int(v) for k, v in r.hgetall(STATS_KEY).items()}
+        entries = r.zcard(INDEX_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"LLM cache stats unavailable: {e}")
+        return {"available": False, "entries": 0, "kinds": {}}
+    kinds = {}
+    for field, count in counts.items():
+        kind, _, outcome = field.rpartition(":")
+        kinds.setdefault(kind, {"hits": 0, "misses": 0})[outcome] = count
+    for entry in kinds.values():
+        total = entry["hits"] + entry["misses"]
+        entry["hit_rate"] = round(entry["hits"] / total, 3) if total else 0.0
+    return {"available": True, "entries": entries, "kinds": kinds}
@@ -1,19 +1,29 @@
+import json
+import logging
+from typing import AsyncIterator
+
 from spoon_ai.agents import SpoonReactAI
-from spoon_ai.chat import ChatBot
-from spoon_ai.tools import BaseTool
+from spoon_ai.tools import BaseTool, ToolManager
 from pydantic import Field
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.config import settings
 from app.models.meeting import Meeting, Transcript, Summary, Participant
-from app.tasks.transcription import get_sync_session
+from app.database import get_sync_session
 from app.tasks.email import send_followup_task
+from app.services.llm import get_llm
 from app.services.recall import recall_service
 import redis
 
+logger = logging.getLogger(__name__)
+
+
+class MeetingTool(BaseTool):
+    cacheable: bool = True  # read-only, so answers built from it can be cached
 
-class ListMeetingsTool(BaseTool):
+
+class ListMeetingsTool(MeetingTool):
     name: str = "list_meetings"
     description: str = "List all meetings with their status. Returns meeting id, title, date, and status."
     parameters: dict = Field(default={"type": "object", "properties": {}}, description="No parameters required")
@@ -37,28 +47,27 @@ class ListMeetingsTool(BaseTool):
             session.close()
 
 
-class GetMeetingDetailsTool(BaseTool):
+class GetMeetingDetailsTool(MeetingTool):
     name: str = "get_meeting_details"
     description: str = "Get detailed information about a specific meeting including transcript and summary. Requires meeting_id."
-    meeting_id: int = Field(description="The ID of the meeting to retrieve")
     parameters: dict = Field(default={"type": "object", "properties": {"meeting_id": {"type": "integer", "description": "The ID of the meeting to retrieve"}}, "required": ["meeting_id"]}, description="Tool parameters")
 
-    async def execute(self) -> str:
+    async def execute(self, meeting_id: int) -> str:
         session = get_sync_session()
         try:
             result = session.execute(
                 select(Meeting)
                 .options(
-                    selectinload(Meeting.transcript),
+                    selectinload(Meeting.transcript).undefer(Transcript.text),
                     selectinload(Meeting.summary),
                     selectinload(Meeting.participants)
                 )
-                .where(Meeting.id == self.meeting_id)
+                .where(Meeting.id == meeting_id)
             )
             meeting = result.scalar_one_or_none()
 
             if not meeting:
-                return f"Meeting {self.meeting_id} not found."
+                return f"Meeting {meeting_id} not found."
 
             output = f"Meeting: {meeting.title}\n"
             output += f"Date: {meeting.date}\n"
@@ -86,7 +95,7 @@ class GetMeetingDetailsTool(BaseTool):
             session.close()
 
 
-class GetLastDiscussionTool(BaseTool):
+class GetLastDiscussionTool(MeetingTool):
     name: str = "get_last_discussion"
     description: str = "Get what was discussed last time. Returns latest meeting summary or transcript snippet."
     parameters: dict = Field(default={"type": "object", "properties": {}}, description="No parameters required")
@@ -97,7 +106,7 @@ class GetLastDiscussionTool(BaseTool):
             result = session.execute(
                 select(Meeting)
                 .options(
-                    selectinload(Meeting.transcript),
+                    selectinload(Meeting.transcript).undefer(Transcript.text),
                     selectinload(Meeting.summary)
                 )
                 .order_by(Meeting.created_at.desc())
@@ -121,48 +130,46 @@ class GetLastDiscussionTool(BaseTool):
             session.close()
 
 
-class SendFollowupEmailTool(BaseTool):
+class SendFollowupEmailTool(MeetingTool):
     name: str = "send_followup_email"
     description: str = "Send follow-up email with meeting summary to all participants. Requires meeting_id."
-    meeting_id: int = Field(description="The ID of the meeting")
-    subject: str = Field(default=None, description="Optional custom email subject")
+    cacheable: bool = False  # has side effects; answers that used it are never cached
     parameters: dict = Field(default={"type": "object", "properties": {"meeting_id": {"type": "integer", "description": "The ID of the meeting"}, "subject": {"type": "string", "description": "Optional custom email subject"}}, "required": ["meeting_id"]}, description="Tool parameters")
 
-    async def execute(self) -> str:
+    async def execute(self, meeting_id: int, subject: str | None = None) -> str:
         session = get_sync_session()
         try:
             result = session.execute(
-                select(Summary).where(Summary.meeting_id == self.meeting_id)
+                select(Summary).where(Summary.meeting_id == meeting_id)
             )
             summary = result.scalar_one_or_none()
 
             if not summary:
-                return f"Meeting {self.meeting_id} must be summarized first."
+                return f"Meeting {meeting_id} must be summarized first."
 
-            task = send_followup_task.delay(self.meeting_id, subject=self.subject)
-            return f"Follow-up email being sent for meeting {self.meeting_id}. Task ID: {task.id}"
+            task = send_followup_task.delay(meeting_id, subject=subject)
+            return f"Follow-up email being sent for meeting {meeting_id}. Task ID: {task.id}"
         finally:
             session.close()
 
 
-class StartRecallMeetingTool(BaseTool):
+class StartRecallMeetingTool(MeetingTool):
     name: str = "start_recall_meeting"
     description: str = "Start a meeting by providing the Zoom/meeting link. Launches Recall and returns meeting ID."
-    meeting_url: str = Field(description="The meeting URL (e.g., Zoom link)")
-    title: str = Field(default=None, description="Optional meeting title")
+    cacheable: bool = False  # has side effects; answers that used it are never cached
     parameters: dict = Field(default={"type": "object", "properties": {"meeting_url": {"type": "string", "description": "The meeting URL (e.g., Zoom link)"}, "title": {"type": "string", "description": "Optional meeting title"}}, "required": ["meeting_url"]}, description="Tool parameters")
 
-    async def execute(self) -> str:
+    async def execute(self, meeting_url: str, title: str | None = None) -> str:
         session = get_sync_session()
         try:
-            meeting = Meeting(title=self.title or "Meeting")
+            meeting = Meeting(title=title or "Meeting")
             session.add(meeting)
             session.flush()
 
             try:
                 data = await recall_service.start_bot(
-                    meeting_url=self.meeting_url,
-                    bot_name=(self.title or "Meeting Bot"),
+                    meeting_url=meeting_url,
+                    bot_name=(title or "Meeting Bot"),
                     external_id=str(meeting.id),
                 )
                 try:
@@ -182,26 +189,35 @@ class StartRecallMeetingTool(BaseTool):
             session.close()
 
 
-def get_meeting_tools():
-    return [
-        ListMeetingsTool(),
-        GetMeetingDetailsTool(meeting_id=0),
-        SendFollowupEmailTool(meeting_id=0),
-        GetLastDiscussionTool(),
-        StartRecallMeetingTool(meeting_url=""),
-    ]
+_tool_manager: ToolManager | None = None
 
 
-def create_meeting_agent():
-    llm = ChatBot(
-        model_name="openai/gpt-4.1",
-        llm_provider="openrouter",
-        llm_api_key=settings.openrouter_api_key,
-    )
-    agent = SpoonReactAI(
-        llm=llm,
-        tools=get_meeting_tools(),
-        system_prompt="""You are a meeting assistant that helps users manage and recall meetings.
+def get_meeting_tools():
+    # Tools take their arguments in execute() and keep no state, so one set serves every request
+    global _tool_manager
+    if _tool_manager is None:
+        _tool_manager = ToolManager([
+            ListMeetingsTool(),
+            GetMeetingDetailsTool(),
+            SendFollowupEmailTool(),
+            GetLastDiscussionTool(),
+            StartRecallMeetingTool(),
+        ])
+    return _tool_manager
+
+
+def is_cacheable_answer(agent: SpoonReactAI) -> bool:
+    """True if the agent's last run only called read-only tools."""
+    tools = get_meeting_tools()
+    for message in agent.memory.get_messages():
+        for call in message.tool_calls or []:
+            tool = tools.tool_map.get(call.function.name)
+            if tool is None or not tool.cacheable:
+                return False
+    return True
+
+
+SYSTEM_PROMPT = """You are a meeting assistant that helps users manage and recall meetings.
 
 You can:
 - Create a meeting by providing a Zoom/meeting link (starts Recall)
@@ -211,5 +227,82 @@ You can:
 - Send follow-up emails to participants
 
 Always be helpful and concise. When a user asks about meetings, list them if no ID is specified. When they share a link, start a new meeting recording via Recall."""
+
+MAX_AGENT_STEPS = 10
+INCOMPLETE_ANSWER = "Sorry, I couldn't finish answering that. Please try rephrasing or narrowing the question."
+
+
+def create_meeting_agent():
+    """A fresh agent (conversation memory) around the shared LLM client and tools."""
+    agent = SpoonReactAI(
+        llm=get_llm(settings.chat_model),
+        available_tools=get_meeting_tools(),
+        system_prompt=SYSTEM_PROMPT,
     )
     return agent
+
+
+async def stream_meeting_agent(question: str) -> AsyncIterator[dict]:
+    """Answer `question` with the meeting tools, streaming as the LLM generates.
+
+    Yields {"type": "delta", "text"} for answer tokens and
+    {"type": "tool", "name", "status": "running" | "done"} around tool calls,
+    then one {"type": "done", "text", "cacheable"} with the full answer. If the
+    agent runs out of steps or produces no text, INCOMPLETE_ANSWER is streamed
+    instead and the answer is marked not cacheable.
+    """
+    llm = get_llm(settings.chat_model)
+    tools = get_meeting_tools()
+    messages: list[dict] = [{"role": "user", "content": question}]
+    answer = ""
+    cacheable = True
+    finished = False
+
+    for _ in range(MAX_AGENT_STEPS):
+        text = ""
+        calls: dict[int, dict] = {}
+        async for chunk in llm.astream(
+            messages, system_msg=SYSTEM_PROMPT, tools=tools.to_params(), tool_choice="auto"
+        ):
+            if chunk.delta:
+                text += chunk.delta
+                yield {"type": "delta", "text": chunk.delta}
+            # Tool calls arrive in pieces keyed by index; only the first piece carries the id
+            for piece in chunk.tool_call_chunks or []:
+                call = calls.setdefault(piece["index"], {"id": None, "name": "", "arguments": ""})
+                call["id"] = piece.get("id") or call["id"]
+                function = piece.get("function") or {}
+                call["name"] += function.get("name") or ""
+                call["arguments"] += function.get("arguments") or ""
+        answer += text
+        if not calls:
+            finished = True
+            break
+
+        messages.append({
+            "role": "assistant",
+            "content": text or None,
+            "tool_calls": [
+                {"id": c["id"], "type": "function", "function": {"name": c["name"], "arguments": c["arguments"]}}
+                for c in calls.values()
+            ],
+        })
+        for call in calls.values():
+            tool = tools.tool_map.get(call["name"])
+            cacheable = cacheable and tool is not None and tool.cacheable
+            yield {"type": "tool", "name": call["name"], "status": "running"}
+            try:
+                result = await tools.execute(name=call["name"], tool_input=json.loads(call["arguments"] or "{}"))
+            except (KeyError, json.JSONDecodeError) as e:
+                result = f"Invalid tool call {call['name']}: {e}"
+            yield {"type": "tool", "name": call["name"], "status": "done"}
+            messages.append({"role": "tool", "content": str(result), "tool_call_id": call["id"], "name": call["name"]})
+
+    if not finished or not answer.strip():
+        logger.warning(f"Agent gave no complete answer ({'out of steps' if not finished else 'empty text'})")
+        fallback = ("\n\n" if answer.strip() else "") + INCOMPLETE_ANSWER
+        yield {"type": "delta", "text": fallback}
+        answer += fallback
+        cacheable = False
+
+    yield {"type": "done", "text": answer, "cacheable": cacheable}
@@ -1,8 +1,22 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 import aiohttp
 from app.config import settings
+from app.services.event_loop import is_persistent
 
 
 class RecallService:
+    FALLBACK_BASES = [
+        "https://us-east-1.recall.ai/api/v1",
+        "https://us-west-2.recall.ai/api/v1",
+        "https://eu-central-1.recall.ai/api/v1",
+        "https://ap-northeast-1.recall.ai/api/v1",
+        "https://api.recall.ai/v1",
+    ]
+    AUTH_SCHEMES = ("token", "raw")
+
     def __init__(self):
         if settings.recall_base_url:
             self.base_url = settings.recall_base_url.rstrip("/")
@@ -10,16 +24,93 @@ class RecallService:
             region = settings.recall_region or "us-east-1"
             self.base_url = f"https://{region}.recall.ai/api/v1"
         self.api_key = settings.recall_api_key
+        self._session: aiohttp.ClientSession | None = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
+        # (base_url, auth scheme) that last succeeded; tried first from then on
+        self._preferred: tuple[str, str] | None = None
 
-    async def start_bot(self, meeting_url: str, bot_name: str | None = None, external_id: str | None = None) -> dict:
-        headers_primary = {
-            "Authorization": f"Token {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        headers_alt = {
-            "Authorization": self.api_key,
+    def _new_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=settings.recall_http_pool_size,
+            ttl_dns_cache=300,
+            keepalive_timeout=60,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=settings.recall_http_timeout),
+        )
+
+    async def open(self):
+        """Keep one pooled session on the running loop (the API's); call close() on shutdown."""
+        await self.close()
+        self._session = self._new_session()
+        self._session_loop = asyncio.get_running_loop()
+
+    @asynccontextmanager
+    async def _session_scope(self) -> AsyncIterator[aiohttp.ClientSession]:
+        # Sessions are bound to an event loop. The API's loop gets one from open();
+        # sync callers (Celery tasks) go through run_sync(), whose loop lives as long
+        # as the worker process, so it gets one too, created on first use.
+        loop = asyncio.get_running_loop()
+        if is_persistent(loop) and (self._session is None or self._session.closed or self._session_loop is not loop):
+            # A session inherited across a fork belongs to the parent's loop; drop it unclosed
+            self._session = self._new_session()
+            self._session_loop = loop
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            yield self._session
+            return
+        # Any other loop (a one-off asyncio.run()) gets a session closed after the call
+        async with self._new_session() as session:
+            yield session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    def _headers(self, scheme: str) -> dict:
+        return {
+            "Authorization": f"Token {self.api_key}" if scheme == "token" else self.api_key,
             "Content-Type": "application/json",
         }
+
+    def _candidates(self) -> list[tuple[str, list[str]]]:
+        bases = list(dict.fromkeys([self.base_url, *self.FALLBACK_BASES]))
+        schemes = list(self.AUTH_SCHEMES)
+        if self._preferred:
+            base, scheme = self._preferred
+            if base in bases:
+                bases.remove(base)
+            bases.insert(0, base)
+            schemes.remove(scheme)
+            schemes.insert(0, scheme)
+        return [(base, schemes) for base in bases]
+
+    async def _request(self, method: str, path: str, timeout: float | None = None, **kwargs) -> dict:
+        """Call the Recall API, walking regions and auth schemes until one works."""
+        if timeout:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        last_error = None
+        async with self._session_scope() as session:
+            for base, schemes in self._candidates():
+                for i, scheme in enumerate(schemes):
+                    try:
+                        async with session.request(
+                            method, f"{base}{path}", headers=self._headers(scheme), **kwargs
+                        ) as resp:
+                            if resp.status in (401, 403) and i < len(schemes) - 1:
+                                continue
+                            resp.raise_for_status()
+                            data = await resp.json()
+                            self._preferred = (base, scheme)
+                            return data
+                    except Exception as e:
+                        last_error = e
+                        break
+        raise last_error if last_error else RuntimeError(f"recall {method} {path} failed")
+
+    async def start_bot(self, meeting_url: str, bot_name: str | None = None, external_id: str | None = None) -> dict:
         payload = {
             "meeting_url": meeting_url,
             "bot_name": bot_name or "wiped.os",
@@ -35,99 +126,13 @@ class RecallService:
         if external_id:
             payload["external_id"] = external_id
 
-        bases = [self.base_url]
-        bases.extend([
-            "https://us-east-1.recall.ai/api/v1",
-            "https://us-west-2.recall.ai/api/v1",
-            "https://eu-central-1.recall.ai/api/v1",
-            "https://ap-northeast-1.recall.ai/api/v1",
-            "https://api.recall.ai/v1",
-        ])
-
-        async with aiohttp.ClientSession() as session:
-            last_error = None
-            for base in bases:
-                try:
-                    async with session.post(f"{base}/bot", json=payload, headers=headers_primary) as resp:
-                        if resp.status in (401, 403):
-                            async with session.post(f"{base}/bot", json=payload, headers=headers_alt) as resp2:
-                                resp2.raise_for_status()
-                                return await resp2.json()
-                        resp.raise_for_status()
-                        return await resp.json()
-                except Exception as e:
-                    last_error = e
-                    continue
-            raise last_error if last_error else RuntimeError("recall start failed")
+        return await self._request("POST", "/bot", json=payload)
 
     async def get_bot(self, bot_id: str) -> dict:
-        headers_primary = {
-            "Authorization": f"Token {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        headers_alt = {
-            "Authorization": self.api_key,
-            "Content-Type": "application/json",
-        }
-
-        bases = [self.base_url]
-        bases.extend([
-            "https://us-east-1.recall.ai/api/v1",
-            "https://us-west-2.recall.ai/api/v1",
-            "https://eu-central-1.recall.ai/api/v1",
-            "https://ap-northeast-1.recall.ai/api/v1",
-            "https://api.recall.ai/v1",
-        ])
-        async with aiohttp.ClientSession() as session:
-            last_error = None
-            for base in bases:
-                try:
-                    async with session.get(f"{base}/bot/{bot_id}", headers=headers_primary) as resp:
-                        if resp.status in (401, 403):
-                            async with session.get(f"{base}/bot/{bot_id}", headers=headers_alt) as resp2:
-                                resp2.raise_for_status()
-                                return await resp2.json()
-                        resp.raise_for_status()
-                        return await resp.json()
-                except Exception as e:
-                    last_error = e
-                    continue
-            raise last_error if last_error else RuntimeError("recall get bot failed")
+        return await self._request("GET", f"/bot/{bot_id}")
 
     async def get_recording(self, recording_id: str) -> dict:
-        headers_primary = {
-            "Authorization": f"Token {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        headers_alt = {
-            "Authorization": self.api_key,
-            "Content-Type": "application/json",
-        }
-
-        bases = [self.base_url]
-        bases.extend([
-            "https://us-east-1.recall.ai/api/v1",
-            "https://us-west-2.recall.ai/api/v1",
-            "https://eu-central-1.recall.ai/api/v1",
-            "https://ap-northeast-1.recall.ai/api/v1",
-            "https://api.recall.ai/v1",
-        ])
-
-        async with aiohttp.ClientSession() as session:
-            last_error = None
-            for base in bases:
-                try:
-                    async with session.get(f"{base}/recording/{recording_id}", headers=headers_primary) as resp:
-                        if resp.status in (401, 403):
-                            async with session.get(f"{base}/recording/{recording_id}", headers=headers_alt) as resp2:
-                                resp2.raise_for_status()
-                                return await resp2.json()
-                        resp.raise_for_status()
-                        return await resp.json()
-                except Exception as e:
-                    last_error = e
-                    continue
-            raise last_error if last_error else RuntimeError("recall get recording failed")
+        return await self._request("GET", f"/recording/{recording_id}")
 
     async def get_audio_mixed(self, recording_id: str) -> dict:
         """Get audio mixed data - this is a placeholder that returns empty since
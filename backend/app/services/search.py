@@ -0,0 +1,98 @@
+"""Full-text search over transcript segments and summaries.
+
+transcript_segments and summaries each carry a stored `search_vector` column
+that Postgres generates from the row's text, so it is indexed as segments are
+written and no reindexing job exists. Matches come from the GIN indexes on
+those columns; only the top hits are ranked into snippets.
+
+Snippets are HTML: the stored text is escaped before ts_headline wraps the
+matches in <mark> tags, so a client can render them as markup safely.
+"""
+
+from sqlalchemy import Integer, Select, cast, func, literal_column, null, select, union_all
+
+from app.models.meeting import Meeting, Summary, TranscriptSegment
+from app.models.user_access import UserAccess
+
+# Must match the text search configuration of the generated columns
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MinWords=10, MaxWords=30, MaxFragments=2"
+
+
+def _html_escape(text):
+    """SQL equivalent of html.escape(text, quote=False); & goes first so it isn't escaped twice."""
+    for char, entity in (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;")):
+        text = func.replace(text, char, entity)
+    return text
+
+
+def _with_access(query: Select, meeting_id, pubkey: str | None) -> Select:
+    if not pubkey:
+        return query
+    return query.join(UserAccess, (UserAccess.meeting_id == meeting_id) & (UserAccess.pubkey == pubkey))
+
+
+def search_statement(q: str, limit: int, pubkey: str | None = None) -> Select:
+    """Best `limit` segment and summary hits for a web-style query (quotes, OR, -word).
+
+    Rows have kind ("segment" or "summary"), meeting_id, title, date, seq,
+    start_ms, end_ms, speaker, rank and an HTML snippet: the text escaped,
+    with matches in <mark> tags.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+    segment_rank = func.ts_rank(TranscriptSegment.search_vector, tsquery)
+    segments = _with_access(
+        select(
+            literal_column("'segment'").label("kind"),
+            TranscriptSegment.meeting_id,
+            TranscriptSegment.seq,
+            TranscriptSegment.start_ms,
+            TranscriptSegment.end_ms,
+            TranscriptSegment.speaker,
+            TranscriptSegment.text,
+            segment_rank.label("rank"),
+        ).where(TranscriptSegment.search_vector.op("@@")(tsquery)),
+        TranscriptSegment.meeting_id,
+        pubkey,
+    ).order_by(segment_rank.desc()).limit(limit)
+
+    summary_rank = func.ts_rank(Summary.search_vector, tsquery)
+    summaries = _with_access(
+        select(
+            literal_column("'summary'").label("kind"),
+            Summary.meeting_id,
+            cast(null(), Integer).label("seq"),
+            cast(null(), Integer).label("start_ms"),
+            cast(null(), Integer).label("end_ms"),
+            cast(null(), TranscriptSegment.speaker.type).label("speaker"),
+            Summary.text,
+            summary_rank.label("rank"),
+        ).where(Summary.search_vector.op("@@")(tsquery)),
+        Summary.meeting_id,
+        pubkey,
+    ).order_by(summary_rank.desc()).limit(limit)
+
+    hits = (
+        union_all(select(segments.subquery()), select(summaries.subquery()))
+        .order_by(literal_column("rank").desc())
+        .limit(limit)
+        .subquery()
+    )
+    # Headlines are the expensive part, so they are built for the final hits only
+    return (
+        select(
+            hits.c.kind,
+            hits.c.meeting_id,
+            Meeting.title,
+            Meeting.date,
+            hits.c.seq,
+            hits.c.start_ms,
+            hits.c.end_ms,
+            hits.c.speaker,
+            hits.c.rank,
+            func.ts_headline(SEARCH_CONFIG, _html_escape(hits.c.text), tsquery, HEADLINE_OPTIONS).label("snippet"),
+        )
+        .join(Meeting, Meeting.id == hits.c.meeting_id)
+        .order_by(hits.c.rank.desc())
+    )
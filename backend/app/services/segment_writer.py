@@ -0,0 +1,226 @@
+"""Bulk writers for transcript_segments (live batches and batch transcription)."""
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import async_session
+from app.models.meeting import Transcript, TranscriptSegment
+from app.services.live_events import publish_segments
+from app.tasks.summarization import schedule_rolling_summary
+
+logger = logging.getLogger(__name__)
+
+
+# Namespace of the advisory lock that serializes seq allocation per meeting
+SEQ_LOCK_CLASS = 7301
+MAX_RETRY_DELAY = 30.0
+
+
+def _seq_lock(meeting_id: int):
+    return select(func.pg_advisory_xact_lock(SEQ_LOCK_CLASS, meeting_id))
+
+
+def _next_seq(meeting_id: int):
+    return select(func.coalesce(func.max(TranscriptSegment.seq) + 1, 0)).where(
+        TranscriptSegment.meeting_id == meeting_id
+    )
+
+
+def allocate_seq(session: Session, meeting_id: int) -> int:
+    """Next free seq for the meeting, held until the caller's transaction ends.
+
+    Every writer of live segments allocates through this lock, so the buffer and
+    one-off segment tasks can't race each other to the same seq.
+    """
+    session.execute(_seq_lock(meeting_id))
+    return session.execute(_next_seq(meeting_id)).scalar_one()
+
+
+class SegmentBuffer:
+    """Collects segments for one meeting and appends them to transcript_segments in batches.
+
+    A batch is written once `flush_size` segments are pending or `flush_interval`
+    seconds after the first pending segment, whichever comes first. Failed writes
+    are retried with backoff; at most `segment_max_pending` segments are held
+    meanwhile, and a batch is dropped after `segment_max_retries` failures.
+    """
+
+    def __init__(
+        self,
+        meeting_id: int,
+        flush_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ):
+        self.meeting_id = meeting_id
+        self.flush_size = flush_size or settings.segment_flush_size
+        self.flush_interval = flush_interval or settings.segment_flush_interval
+        self._pending: list[dict] = []
+        self._failures = 0
+        self.dropped = 0
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(
+        self,
+        text: str,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        confidence: Optional[float] = None,
+        speaker: Optional[str] = None,
+    ):
+        self._pending.append(
+            {
+                "meeting_id": self.meeting_id,
+                "text": text,
+                "start_ms": start_ms,
+                "end_ms": end_ms,
+                "speaker": speaker,
+                "confidence": confidence,
+            }
+        )
+        if len(self._pending) > settings.segment_max_pending:
+            self._drop(1, "write backlog full")
+            self._pending.pop(0)
+        # While writes are failing only the backoff timer retries
+        if len(self._pending) >= self.flush_size and not self._failures:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later(self.flush_interval))
+
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        self._timer = None
+        await self.flush()
+
+    def _drop(self, count: int, reason: str):
+        self.dropped += count
+        logger.error(f"Dropped {count} segments for meeting {self.meeting_id}: {reason}")
+
+    async def flush(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                async with async_session() as session:
+                    await session.execute(_seq_lock(self.meeting_id))
+                    next_seq = (await session.execute(_next_seq(self.meeting_id))).scalar_one()
+                    for i, row in enumerate(batch):
+                        row["seq"] = next_seq + i
+                    await session.execute(insert(TranscriptSegment), batch)
+                    await session.commit()
+                self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                logger.error(
+                    f"Failed to write {len(batch)} segments for meeting {self.meeting_id} "
+                    f"(attempt {self._failures}): {e}"
+                )
+                if self._failures >= settings.segment_max_retries:
+                    self._drop(len(batch), f"{self._failures} failed writes")
+                    self._failures = 0
+                else:
+                    self._pending = batch + self._pending
+                overflow = len(self._pending) - settings.segment_max_pending
+                if overflow > 0:
+                    self._drop(overflow, "write backlog full")
+                    self._pending = self._pending[overflow:]
+                if self._pending and self._timer is None:
+                    delay = min(self.flush_interval * 2 ** self._failures, MAX_RETRY_DELAY)
+                    self._timer = asyncio.create_task(self._flush_later(delay))
+                return
+
+        try:
+            await publish_segments(self.meeting_id, batch)
+        except Exception as e:
+            logger.warning(f"Failed to publish segments for meeting {self.meeting_id}: {e}")
+
+        try:
+            await asyncio.to_thread(schedule_rolling_summary, self.meeting_id, [row["text"] for row in batch])
+        except Exception as e:
+            logger.warning(f"Failed to schedule rolling summary for meeting {self.meeting_id}: {e}")
+
+    async def close(self):
+        """Write what's pending; logs an error if any segments of the stream were lost."""
+        await self.flush()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            self._drop(len(self._pending), "still unwritten when the stream closed")
+            self._pending = []
+        if self.dropped:
+            logger.error(f"Meeting {self.meeting_id}: {self.dropped} live segments could not be stored")
+
+
+def _ms(seconds) -> Optional[int]:
+    return None if seconds is None else round(seconds * 1000)
+
+
+def replace_segments(session: Session, meeting_id: int, items: list[dict]):
+    """Replace a meeting's transcript_segments with batch transcription output.
+
+    `items` are {"start", "end", "text"} with times in seconds, optionally with
+    "speaker". Written with one multi-row insert; the caller commits.
+    """
+    session.execute(_seq_lock(meeting_id))
+    session.execute(delete(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id))
+    rows = [
+        {
+            "meeting_id": meeting_id,
+            "seq": seq,
+            "text": item.get("text", ""),
+            "start_ms": _ms(item.get("start")),
+            "end_ms": _ms(item.get("end")),
+            "speaker": item.get("speaker"),
+            "confidence": item.get("confidence"),
+        }
+        for seq, item in enumerate(items)
+    ]
+    if rows:
+        session.execute(insert(TranscriptSegment), rows)
+
+
+def materialize_transcript(session: Session, meeting_id: int) -> Optional[Transcript]:
+    """Build Transcript.text/segments from transcript_segments in one write.
+
+    The caller commits. Returns None if the meeting has no segments.
+    """
+    rows = session.execute(
+        select(TranscriptSegment)
+        .where(TranscriptSegment.meeting_id == meeting_id)
+        .order_by(TranscriptSegment.seq)
+    ).scalars().all()
+    if not rows:
+        return None
+
+    text = " ".join(r.text for r in rows)
+    segments = [
+        {
+            "text": r.text,
+            "speaker": r.speaker,
+            "timestamp": r.created_at.isoformat() if r.created_at else "",
+            "confidence": r.confidence,
+        }
+        for r in rows
+    ]
+
+    transcript = session.execute(
+        select(Transcript).where(Transcript.meeting_id == meeting_id)
+    ).scalar_one_or_none()
+    if transcript:
+        transcript.text = text
+        transcript.segments = segments
+    else:
+        transcript = Transcript(meeting_id=meeting_id, text=text, segments=segments)
+        session.add(transcript)
+    return transcript
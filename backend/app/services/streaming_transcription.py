@@ -1,120 +1,337 @@
 """Real-time transcription service for streaming audio from Zoom meetings."""
 
 import asyncio
-import json
-from typing import AsyncGenerator, Callable, Optional
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncGenerator, Awaitable, Callable, Optional
 from datetime import datetime
 
-import openai
+import numpy as np
 
 from app.config import settings
+from app.services.transcription import (
+    SAMPLE_RATE,
+    TranscriptionBackend,
+    create_transcription_backend,
+)
 
+VAD_FRAME = int(SAMPLE_RATE * 0.03)
 
-class StreamingTranscriptionService:
-    """Service for transcribing real-time audio streams using OpenAI Whisper."""
+# Decoding runs here so the event loop keeps serving sockets. The pool is shared by
+# every live meeting in the process, which bounds CPU use regardless of meeting count.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.streaming_max_concurrency,
+    thread_name_prefix="streaming-asr",
+)
+_local = threading.local()
+_shared_backends: dict[str, TranscriptionBackend] = {}
+_spare_backends: dict[str, list[TranscriptionBackend]] = {}  # preloaded, not yet claimed by a thread
+_preloaded: set[str] = set()
+_shared_lock = threading.Lock()
+
+
+def _get_backend(model_name: str) -> TranscriptionBackend:
+    """Backend for the calling executor thread: shared if thread-safe, else per thread."""
+    backends = getattr(_local, "backends", None)
+    if backends is None:
+        backends = _local.backends = {}
+    backend = backends.get(model_name)
+    if backend is not None:
+        return backend
+
+    with _shared_lock:
+        backend = _shared_backends.get(model_name)
+        if backend is None and _spare_backends.get(model_name):
+            backend = _spare_backends[model_name].pop()
+        if backend is None:
+            backend = _create_backend(model_name)
+    backends[model_name] = backend
+    return backend
+
+
+def _create_backend(model_name: str) -> TranscriptionBackend:
+    """Call with _shared_lock held."""
+    # A shared backend must be able to decode for every executor thread at once
+    backend = create_transcription_backend(model_name, workers=settings.streaming_max_concurrency)
+    if backend.thread_safe:
+        _shared_backends[model_name] = backend
+    return backend
+
+
+def _preload(model_name: str):
+    with _shared_lock:
+        if model_name in _preloaded or model_name in _shared_backends:
+            return
+        _preloaded.add(model_name)
+        backend = _create_backend(model_name)
+        if not backend.thread_safe:
+            # One instance per decode thread, handed out as threads first need one
+            spares = _spare_backends.setdefault(model_name, [backend])
+            for _ in range(settings.streaming_max_concurrency - 1):
+                spares.append(create_transcription_backend(model_name))
+
+
+async def preload_model(model_name: str):
+    """Load `model_name` off the decode threads so switching to it later doesn't stall decoding."""
+    await asyncio.to_thread(_preload, model_name)
+
+
+def _decode(model_name: str, audio: np.ndarray, language: Optional[str]) -> list[dict]:
+    return _get_backend(model_name).transcribe(audio, language=language)
+
+
+async def _maybe_await(result):
+    if inspect.isawaitable(result):
+        await result
+
+
+def _ms(samples: int) -> int:
+    return samples * 1000 // SAMPLE_RATE
+
+
+class AudioGap:
+    """Stream item standing for audio dropped before it reached the engine.
+
+    The engine advances its clock by `samples`, so timestamps of later
+    segments stay in meeting time.
+    """
+
+    def __init__(self, samples: int):
+        self.samples = samples
+
+
+class AudioRingBuffer:
+    """Preallocated float32 buffer addressed by absolute sample index.
+
+    Writes wrap around instead of growing; only the newest `capacity` samples
+    are readable.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self.end = 0  # absolute index one past the newest sample
+
+    @property
+    def start(self) -> int:
+        return max(0, self.end - self.capacity)
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        if n > self.capacity:
+            self.end += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+        pos = self.end % self.capacity
+        first = min(n, self.capacity - pos)
+        self._buf[pos:pos + first] = samples[:first]
+        self._buf[:n - first] = samples[first:]
+        self.end += n
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy of samples [start, end), clamped to what's still buffered."""
+        start = max(start, self.start)
+        end = min(end, self.end)
+        out = np.empty(max(0, end - start), dtype=np.float32)
+        if len(out) == 0:
+            return out
+        pos = start % self.capacity
+        first = min(len(out), self.capacity - pos)
+        out[:first] = self._buf[pos:pos + first]
+        out[first:] = self._buf[:len(out) - first]
+        return out
+
+
+def _common_prefix(a: list[str], b: list[str]) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def _strip_overlap(committed_tail: list[str], words: list[str]) -> list[str]:
+    """Drop leading words that repeat the end of what was already committed."""
+    for k in range(min(len(committed_tail), len(words)), 0, -1):
+        if committed_tail[-k:] == words[:k]:
+            return words[k:]
+    return words
+
+
+class _StreamState:
+    """Sliding-window decode state for one audio stream."""
 
     def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
-        self.model = settings.whisper_model
+        self.step = SAMPLE_RATE * settings.streaming_step_ms // 1000
+        self.max_window = SAMPLE_RATE * settings.streaming_max_window_ms // 1000
+        self.overlap = SAMPLE_RATE * settings.streaming_overlap_ms // 1000
+        self.silence = SAMPLE_RATE * settings.streaming_silence_ms // 1000
+        self.ring = AudioRingBuffer(self.max_window + self.step + self.overlap)
+        self._leftover = b""
+
+        self.gap_samples = 0  # audio dropped upstream; the ring only holds what arrived
+        self.gap_at = 0  # ring index of the last gap; windows never reach back across it
+        self.window_start = 0  # first sample of audio that isn't committed yet
+        self.last_decode_end = 0
+        self.last_speech_end: Optional[int] = None
+        self.prev_words: list[str] = []  # previous hypothesis for the current window
+        self.committed = 0  # words of the current window already emitted as final
+        self.committed_until_ms = 0
+        self.overlap_words: list[str] = []  # committed words that may reappear in the overlap
+
+    def push(self, chunk: bytes):
+        """Append 16-bit little-endian mono PCM and update voice activity."""
+        data = self._leftover + chunk if self._leftover else chunk
+        usable = len(data) - len(data) % 2
+        self._leftover = data[usable:]
+        if not usable:
+            return
+        samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        chunk_start = self.ring.end
+        self.ring.write(samples)
+
+        n_frames = max(1, len(samples) // VAD_FRAME)
+        frame = len(samples) // n_frames
+        frames = samples[: n_frames * frame].reshape(n_frames, frame)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        voiced = np.nonzero(rms > settings.streaming_vad_threshold)[0]
+        if len(voiced):
+            self.last_speech_end = chunk_start + (voiced[-1] + 1) * frame
+
+    def ms(self, sample: int) -> int:
+        """Meeting time of a ring sample index."""
+        return _ms(sample + self.gap_samples)
+
+    def has_speech(self) -> bool:
+        return self.last_speech_end is not None and self.last_speech_end > self.window_start
+
+    def reset_window(self, new_start: int, keep_overlap_words: list[str]):
+        self.window_start = new_start
+        self.last_decode_end = new_start
+        self.prev_words = []
+        self.committed = 0
+        self.overlap_words = keep_overlap_words
+
+
+class StreamingTranscriptionService:
+    """Local streaming transcription with VAD-gated sliding windows.
+
+    Audio is decoded in overlapping windows that start at the last commit point.
+    Words are committed (final) once two consecutive hypotheses agree on them, and
+    the rest of the window is committed when the speaker pauses or the window
+    reaches its maximum length. Uncommitted words are reported as partials.
+    """
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model = model_name or settings.streaming_whisper_model or settings.whisper_model
 
     async def transcribe_stream(
         self,
-        audio_stream: AsyncGenerator[bytes, None],
-        on_transcript: Callable[[str, dict], None],
+        audio_stream: AsyncGenerator[bytes | AudioGap, None],
+        on_transcript: Callable[[str, dict], None | Awaitable[None]],
         language: Optional[str] = None,
+        on_partial: Optional[Callable[[str, dict], None | Awaitable[None]]] = None,
     ) -> str:
         """Transcribe a real-time audio stream.
 
         Args:
-            audio_stream: Async generator yielding audio chunks (PCM format)
-            on_transcript: Callback function called for each transcription segment
-                          Signature: on_transcript(text: str, metadata: dict)
+            audio_stream: Async generator yielding audio chunks (16 kHz mono PCM16),
+                          or AudioGap where audio was dropped
+            on_transcript: Callback function called for each final transcription segment
+                          Signature: on_transcript(text: str, metadata: dict), may be async
             language: Optional language code (e.g., 'en', 'es')
+            on_partial: Optional callback for the current unstable hypothesis
 
         Returns:
             Full transcript text
         """
-        full_transcript = ""
-        buffer = b""
-        min_chunk_size = 4096  # Minimum audio chunk size for whisper
+        state = _StreamState()
+        final_texts: list[str] = []
 
-        async for chunk in audio_stream:
-            buffer += chunk
-
-            # Process buffer when it reaches minimum size
-            if len(buffer) >= min_chunk_size:
-                try:
-                    transcript_data = await self._transcribe_audio_chunk(
-                        buffer, language
-                    )
-
-                    if transcript_data and transcript_data.get("text"):
-                        text = transcript_data["text"].strip()
-                        if text:
-                            full_transcript += " " + text
-                            # Call callback with transcribed segment
-                            metadata = {
-                                "timestamp": datetime.utcnow().isoformat(),
-                                "confidence": transcript_data.get("confidence"),
-                            }
-                            on_transcript(text, metadata)
-
-                    buffer = b""
-                except Exception as e:
-                    print(f"Error transcribing audio chunk: {e}")
-                    # Clear buffer on error to continue processing
-                    buffer = b""
-
-        # Process remaining buffer
-        if buffer:
+        async def commit(words: list[str], end_ms: int):
+            if not words:
+                return
+            text = " ".join(words)
+            final_texts.append(text)
+            metadata = {
+                "timestamp": datetime.utcnow().isoformat(),
+                "confidence": None,
+                "start_ms": state.committed_until_ms,
+                "end_ms": end_ms,
+                "final": True,
+            }
+            state.committed_until_ms = end_ms
+            await _maybe_await(on_transcript(text, metadata))
+
+        async def decode() -> tuple[list[str], int]:
+            now = state.ring.end
+            audio = state.ring.read(state.window_start, now)
+            state.last_decode_end = now
             try:
-                transcript_data = await self._transcribe_audio_chunk(
-                    buffer, language
+                segments = await asyncio.get_running_loop().run_in_executor(
+                    _executor, _decode, self.model, audio, language
                 )
-                if transcript_data and transcript_data.get("text"):
-                    text = transcript_data["text"].strip()
-                    if text:
-                        full_transcript += " " + text
-                        metadata = {
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "confidence": transcript_data.get("confidence"),
-                        }
-                        on_transcript(text, metadata)
             except Exception as e:
-                print(f"Error transcribing final audio chunk: {e}")
+                print(f"Error transcribing audio window: {e}")
+                return state.prev_words, state.ms(now)
+            words = " ".join(s["text"].strip() for s in segments).split()
+            words = _strip_overlap(state.overlap_words, words)
+            end_ms = state.ms(state.window_start) + int(segments[-1]["end"] * 1000) if segments else state.ms(now)
+            return words, min(end_ms, state.ms(now))
 
-        return full_transcript.strip()
+        async def finalize(new_start: int):
+            words, end_ms = await decode()
+            await commit(words[state.committed:], end_ms)
+            tail = (state.overlap_words + words)[-20:] if new_start < state.ring.end else []
+            state.reset_window(new_start, tail)
+            state.committed_until_ms = max(state.committed_until_ms, state.ms(new_start))
 
-    async def _transcribe_audio_chunk(
-        self, audio_data: bytes, language: Optional[str] = None
-    ) -> dict:
-        """Transcribe a single audio chunk using OpenAI Whisper API.
+        async for chunk in audio_stream:
+            if isinstance(chunk, AudioGap):
+                # Audio is discontinuous here: close the current utterance, then skip ahead
+                if state.has_speech():
+                    await finalize(state.ring.end)
+                state.gap_samples += chunk.samples
+                state.gap_at = state.ring.end
+                state.reset_window(state.ring.end, [])
+                state.committed_until_ms = state.ms(state.ring.end)
+                continue
 
-        Args:
-            audio_data: Raw audio bytes (PCM format)
-            language: Optional language code
+            state.push(chunk)
+            now = state.ring.end
 
-        Returns:
-            Transcription data with 'text' and 'confidence' keys
-        """
-        # Note: In production, you'd want to handle audio format conversion
-        # and proper API interactions with Whisper
-        try:
-            # This is a placeholder for actual Whisper API call
-            # You may need to adjust based on your actual API usage
-            result = await asyncio.to_thread(
-                lambda: self._sync_transcribe(audio_data, language)
-            )
-            return result
-        except Exception as e:
-            print(f"Whisper transcription error: {e}")
-            return {"text": "", "confidence": 0}
-
-    def _sync_transcribe(self, audio_data: bytes, language: Optional[str]) -> dict:
-        """Synchronous wrapper for Whisper transcription."""
-        # This would be implemented with actual Whisper model loading
-        # For now, returning empty transcription as placeholder
-        return {"text": "", "confidence": 0.0}
+            if not state.has_speech():
+                # Silence only: skip the model entirely, keep a little pre-roll
+                if now - state.window_start > state.overlap:
+                    state.reset_window(max(now - state.overlap, state.gap_at), [])
+                    state.committed_until_ms = state.ms(state.window_start)
+                continue
+
+            if now - state.last_speech_end >= state.silence:
+                # Pause after speech: commit the utterance and start fresh at the pause
+                await finalize(now)
+            elif now - state.window_start >= state.max_window:
+                # Long monologue: commit and slide, re-decoding a little overlap for context
+                await finalize(now - state.overlap)
+            elif now - state.last_decode_end >= state.step:
+                words, end_ms = await decode()
+                stable = _common_prefix(state.prev_words, words)
+                if stable > state.committed:
+                    await commit(words[state.committed:stable], end_ms)
+                    state.committed = stable
+                state.prev_words = words
+                if on_partial and len(words) > state.committed:
+                    await _maybe_await(on_partial(
+                        " ".join(words[state.committed:]),
+                        {"start_ms": state.committed_until_ms, "end_ms": end_ms, "final": False},
+                    ))
+
+        if state.has_speech():
+            await finalize(state.ring.end)
+
+        return " ".join(final_texts)
 
 
 streaming_transcription_service = StreamingTranscriptionService()
@@ -1,50 +1,205 @@
 import asyncio
-from spoon_ai.agents import SpoonReactAI
-from spoon_ai.chat import ChatBot
+import json
+import logging
 from app.config import settings
+from app.services.event_loop import run_sync
+from app.services.llm import get_llm
 
+logger = logging.getLogger(__name__)
 
-async def generate_meeting_summary(transcript_text: str) -> dict:
-    agent = SpoonReactAI(
-        llm=ChatBot(
-            model_name="openai/gpt-4.1",
-            llm_provider="openrouter",
-            llm_api_key=settings.openrouter_api_key,
-        )
-    )
-
-    prompt = f"""Analyze the following meeting transcript and provide:
-1. A concise summary (2-3 paragraphs)
-2. A list of action items with assignees (if mentioned)
-3. Key decisions made during the meeting
+# Rough tokens-per-character ratio for English text; good enough for budgeting
+CHARS_PER_TOKEN = 4
 
-Format your response as JSON with the following structure:
-{{
+JSON_FORMAT = """{
     "summary": "...",
     "action_items": [
-        {{"task": "...", "assignee": "...", "deadline": "..."}}
+        {"task": "...", "assignee": "...", "deadline": "..."}
     ],
     "decisions": ["...", "..."]
-}}
+}"""
 
-Transcript:
-{transcript_text}
-"""
 
-    response = await agent.run(prompt)
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _segment_texts(transcript_text: str, segments=None) -> list[str]:
+    """Transcript pieces that must not be split: segments if we have them, else lines."""
+    if isinstance(segments, dict):
+        segments = segments.get("items")
+    if isinstance(segments, dict):
+        segments = list(segments.values())
+    if isinstance(segments, list):
+        texts = [s.get("text", "").strip() for s in segments if isinstance(s, dict)]
+        texts = [t for t in texts if t]
+        if texts:
+            return texts
+    return [line for line in transcript_text.splitlines() if line.strip()] or [transcript_text]
+
+
+def split_transcript(pieces: list[str], max_tokens: int) -> list[str]:
+    """Pack consecutive pieces into chunks of at most ~max_tokens, cutting only between pieces."""
+    chunks = []
+    current: list[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        tokens = estimate_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
 
-    import json
+async def _run_prompt(prompt: str) -> str:
+    # Single-turn and tool-free, so ask the shared client directly rather than through an agent
+    return await get_llm(settings.summary_model).ask([{"role": "user", "content": prompt}])
+
+
+def _parse_result(response: str) -> dict:
+    text = response.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
     try:
-        result = json.loads(response)
+        result = json.loads(text)
     except json.JSONDecodeError:
-        result = {
+        result = None
+    if not isinstance(result, dict):
+        return {
             "summary": response,
             "action_items": [],
             "decisions": []
         }
-
+    result.setdefault("summary", "")
+    result.setdefault("action_items", [])
+    result.setdefault("decisions", [])
     return result
 
 
-def generate_meeting_summary_sync(transcript_text: str) -> dict:
-    return asyncio.run(generate_meeting_summary(transcript_text))
+async def _summarize_text(transcript_text: str) -> dict:
+    prompt = f"""Analyze the following meeting transcript and provide:
+1. A concise summary (2-3 paragraphs)
+2. A list of action items with assignees (if mentioned)
+3. Key decisions made during the meeting
+
+Format your response as JSON with the following structure:
+{JSON_FORMAT}
+
+Transcript:
+{transcript_text}
+"""
+    return _parse_result(await _run_prompt(prompt))
+
+
+async def _summarize_chunk(chunk: str, index: int, total: int, semaphore: asyncio.Semaphore) -> dict:
+    prompt = f"""The following is part {index + 1} of {total} of a meeting transcript.
+Summarize only this part and provide:
+1. A summary of what was discussed, keeping names, numbers and open questions
+2. Action items with assignees (if mentioned)
+3. Decisions made in this part
+
+Format your response as JSON with the following structure:
+{JSON_FORMAT}
+
+Transcript part:
+{chunk}
+"""
+    async with semaphore:
+        return _parse_result(await _run_prompt(prompt))
+
+
+async def _reduce(partials: list[dict], final: bool) -> dict:
+    notes = json.dumps(partials, ensure_ascii=False, indent=1)
+    length = "A concise summary (2-3 paragraphs)" if final else "A summary of the whole span, keeping names, numbers and open questions"
+    prompt = f"""The following are notes on consecutive parts of one meeting, in order, as JSON.
+Combine them into notes for the whole meeting:
+1. {length}
+2. All action items, merging duplicates
+3. All decisions, merging duplicates and dropping ones reversed later in the meeting
+
+Format your response as JSON with the following structure:
+{JSON_FORMAT}
+
+Notes:
+{notes}
+"""
+    return _parse_result(await _run_prompt(prompt))
+
+
+async def _reduce_all(partials: list[dict], semaphore: asyncio.Semaphore) -> dict:
+    """Merge partial results, in several rounds if they don't fit in one reduce prompt."""
+    budget = settings.summary_reduce_tokens
+    while True:
+        groups: list[list[dict]] = [[]]
+        group_tokens = 0
+        for partial in partials:
+            tokens = estimate_tokens(json.dumps(partial, ensure_ascii=False))
+            if groups[-1] and group_tokens + tokens > budget:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(partial)
+            group_tokens += tokens
+        if len(groups) == 1:
+            return await _reduce(partials, final=True)
+
+        async def reduce_group(group: list[dict]) -> dict:
+            if len(group) == 1:
+                return group[0]
+            async with semaphore:
+                return await _reduce(group, final=False)
+
+        reduced = await asyncio.gather(*(reduce_group(g) for g in groups))
+        if len(reduced) >= len(partials):
+            # Every group was a single oversized partial; more rounds won't shrink it
+            return await _reduce(reduced, final=True)
+        partials = reduced
+
+
+async def generate_meeting_summary(transcript_text: str, segments=None) -> dict:
+    """Summarize a transcript into {"summary", "action_items", "decisions"}.
+
+    Transcripts within summary_max_input_tokens go out in one prompt. Longer ones
+    are split on segment boundaries into summary_chunk_tokens chunks, summarized
+    concurrently (at most summary_concurrency calls at a time) and merged.
+    """
+    if estimate_tokens(transcript_text) <= settings.summary_max_input_tokens:
+        return await _summarize_text(transcript_text)
+
+    chunks = split_transcript(_segment_texts(transcript_text, segments), settings.summary_chunk_tokens)
+    logger.info(f"Summarizing transcript of ~{estimate_tokens(transcript_text)} tokens in {len(chunks)} chunks")
+    semaphore = asyncio.Semaphore(settings.summary_concurrency)
+    partials = await asyncio.gather(
+        *(_summarize_chunk(chunk, i, len(chunks), semaphore) for i, chunk in enumerate(chunks))
+    )
+    return await _reduce_all(list(partials), semaphore)
+
+
+async def update_rolling_summary(notes: dict | None, pieces: list[str], final: bool = False) -> dict:
+    """Fold newly committed transcript pieces into a live meeting's running notes.
+
+    `notes` is the previous result (None on the first call). With final=True the
+    result is the meeting's finished summary; since only the new tail of the
+    transcript is read, that takes one or two calls however long the meeting was.
+    """
+    semaphore = asyncio.Semaphore(settings.summary_concurrency)
+    chunks = split_transcript(pieces, settings.summary_chunk_tokens) if pieces else []
+    partials = await asyncio.gather(
+        *(_summarize_chunk(chunk, i, len(chunks), semaphore) for i, chunk in enumerate(chunks))
+    )
+    parts = ([notes] if notes else []) + list(partials)
+    if not parts:
+        return {"summary": "", "action_items": [], "decisions": []}
+    if len(parts) == 1 and not final:
+        return parts[0]
+    return await _reduce(parts, final=final)
+
+
+def generate_meeting_summary_sync(transcript_text: str, segments=None) -> dict:
+    return run_sync(generate_meeting_summary(transcript_text, segments))
+
+
+def update_rolling_summary_sync(notes: dict | None, pieces: list[str], final: bool = False) -> dict:
+    return run_sync(update_rolling_summary(notes, pieces, final))
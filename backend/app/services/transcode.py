@@ -0,0 +1,175 @@
+"""Decode recordings to 16 kHz mono PCM16, the only form transcription needs.
+
+Raw little-endian PCM16 at 16 kHz is 32 KB per second of audio, an order of
+magnitude smaller than the mixed video Recall and zoomrec produce, and it loads
+straight into numpy without another ffmpeg pass.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+from typing import Callable, Optional
+
+import aiohttp
+from yarl import URL
+
+from app.services.downloader import auth_header_candidates
+
+logger = logging.getLogger(__name__)
+
+PCM_SUFFIX = ".pcm"
+PCM_SAMPLE_RATE = 16000
+READ_SIZE = 1024 * 1024
+PROBE_BYTES = 64 * 1024
+PROBE_MAX_BOXES = 16
+
+FFMPEG_PCM_ARGS = ["-vn", "-ac", "1", "-ar", str(PCM_SAMPLE_RATE), "-f", "s16le"]
+
+
+class TranscodeError(Exception):
+    pass
+
+
+def pcm_path_for(meeting_id: int, upload_dir: str) -> str:
+    return os.path.join(upload_dir, f"meeting_{meeting_id}{PCM_SUFFIX}")
+
+
+async def _write_output(stdout: asyncio.StreamReader, path: str) -> int:
+    written = 0
+    with open(path, "wb") as f:
+        while True:
+            data = await stdout.read(READ_SIZE)
+            if not data:
+                return written
+            await asyncio.to_thread(f.write, data)
+            written += len(data)
+
+
+async def _read_range(session: aiohttp.ClientSession, url: str, headers: dict, start: int, length: int) -> Optional[bytes]:
+    """Bytes [start, start + length) of `url`, or None if the server ignores Range."""
+    headers = {**headers, "Range": f"bytes={start}-{start + length - 1}"}
+    async with session.get(URL(url, encoded=True), headers=headers) as resp:
+        resp.raise_for_status()
+        if resp.status != 206 and start > 0:
+            return None
+        return await resp.content.read(length)
+
+
+async def probe_streamable(url: str) -> bool:
+    """Whether ffmpeg can decode `url` from a pipe, judged from its leading bytes.
+
+    Only mp4/mov can fail: their index (moov box) must come before the media
+    data (mdat) unless the file is fragmented. The top-level boxes are walked
+    with small Range requests; anything inconclusive counts as streamable.
+    """
+    headers = auth_header_candidates(url)[0]
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        head = await _read_range(session, url, headers, 0, PROBE_BYTES)
+        if not head or head[4:8] != b"ftyp":
+            return True
+        offset = 0
+        for _ in range(PROBE_MAX_BOXES):
+            if offset + 16 <= len(head):
+                box = head[offset:offset + 16]
+            else:
+                box = await _read_range(session, url, headers, offset, 16)
+                if box is None or len(box) < 8:
+                    return True
+            size, kind = struct.unpack(">I4s", box[:8])
+            if kind in (b"moov", b"moof"):
+                return True
+            if kind == b"mdat":
+                return False
+            if size == 1 and len(box) >= 16:
+                size = struct.unpack(">Q", box[8:16])[0]
+            if size < 8:
+                return True
+            offset += size
+    return True
+
+
+async def stream_transcode(
+    url: str,
+    dest: str,
+    on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+) -> str:
+    """Download `url` and decode it through ffmpeg as it arrives; only PCM hits the disk.
+
+    Needs a streamable container (mp3, webm/mkv, fragmented or faststart mp4).
+    Raises TranscodeError when ffmpeg can't decode from a pipe, so the caller can
+    fall back to download-then-decode. An mp4 whose index is at the end is
+    detected up front by probe_streamable, before any media is downloaded.
+    """
+    try:
+        streamable = await probe_streamable(url)
+    except Exception as e:
+        logger.info(f"Could not probe {url} ({e}), trying to stream it")
+        streamable = True
+    if not streamable:
+        raise TranscodeError("mp4 index (moov) is after the media data, needs a seekable file")
+
+    tmp = dest + ".part"
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0", *FFMPEG_PCM_ARGS, "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def feed():
+        headers = auth_header_candidates(url)[0]
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(URL(url, encoded=True), headers=headers) as resp:
+                    resp.raise_for_status()
+                    done = 0
+                    async for chunk in resp.content.iter_chunked(256 * 1024):
+                        proc.stdin.write(chunk)
+                        await proc.stdin.drain()
+                        done += len(chunk)
+                        if on_progress:
+                            on_progress(done, resp.content_length)
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg gave up; its exit code and stderr explain why
+            pass
+        finally:
+            if not proc.stdin.is_closing():
+                proc.stdin.close()
+
+    feeder = asyncio.create_task(feed())
+    try:
+        written, stderr = await asyncio.gather(_write_output(proc.stdout, tmp), proc.stderr.read())
+        await feeder
+    except BaseException:
+        feeder.cancel()
+        if proc.returncode is None:
+            proc.kill()
+        raise
+    returncode = await proc.wait()
+
+    if returncode != 0 or written == 0:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise TranscodeError(stderr.decode("utf-8", "replace").strip() or f"ffmpeg exited with {returncode}")
+    os.replace(tmp, dest)
+    return dest
+
+
+async def transcode_file(src: str, dest: str) -> str:
+    """Decode a local recording to PCM."""
+    tmp = dest + ".part"
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", src, *FFMPEG_PCM_ARGS, tmp,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise TranscodeError(stderr.decode("utf-8", "replace").strip() or f"ffmpeg exited with {proc.returncode}")
+    os.replace(tmp, dest)
+    return dest
@@ -1,68 +1,279 @@
 import os
-import aiohttp
-from yarl import URL
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable
+
+import numpy as np
 import whisper
 
 from app.config import settings
+from app.services.downloader import RangeDownloader
+from app.services.transcode import PCM_SUFFIX
+from app.services.transcription_cache import file_digest, get_transcription_cache
+
+
+class TranscriptionBackend(ABC):
+    """A loaded speech-to-text model.
+
+    transcribe() takes a file path or 16 kHz mono float32 audio and returns
+    segments as [{"start", "end", "text"}] with times in seconds. Backends that
+    aren't thread_safe need one instance per thread; thread-safe ones run up to
+    `workers` transcribe() calls in parallel.
+    """
+
+    thread_safe = False
+
+    def __init__(self, model_name: str, threads: int = 0, workers: int = 1):
+        self.model_name = model_name
+
+    @abstractmethod
+    def transcribe(self, audio: np.ndarray | str, language: str | None = None) -> list[dict]:
+        ...
+
+
+_backends: dict[str, type[TranscriptionBackend]] = {}
+
+
+def register_backend(name: str):
+    def decorator(cls: type[TranscriptionBackend]) -> type[TranscriptionBackend]:
+        _backends[name] = cls
+        return cls
+    return decorator
+
+
+@register_backend("openai-whisper")
+class OpenAIWhisperBackend(TranscriptionBackend):
+    """Reference PyTorch implementation."""
+
+    def __init__(self, model_name: str, threads: int = 0, workers: int = 1):
+        super().__init__(model_name, threads, workers)
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        self.model = whisper.load_model(model_name)
+
+    def transcribe(self, audio: np.ndarray | str, language: str | None = None) -> list[dict]:
+        result = self.model.transcribe(audio, language=language)
+        return [
+            {
+                "start": seg["start"],
+                "end": seg["end"],
+                "text": seg["text"]
+            }
+            for seg in result["segments"]
+        ]
+
+
+@register_backend("faster-whisper")
+class FasterWhisperBackend(TranscriptionBackend):
+    """CTranslate2 engine with quantized weights, much faster on CPU-only workers."""
+
+    thread_safe = True
+
+    def __init__(self, model_name: str, threads: int = 0, workers: int = 1):
+        super().__init__(model_name, threads, workers)
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "faster-whisper backend requires the 'cpu' extra: uv sync --extra cpu"
+            ) from e
+
+        self.model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=settings.whisper_compute_type,
+            cpu_threads=threads,
+            num_workers=workers,
+        )
+
+    def transcribe(self, audio: np.ndarray | str, language: str | None = None) -> list[dict]:
+        segments, _info = self.model.transcribe(audio, language=language)
+        return [
+            {
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text
+            }
+            for seg in segments
+        ]
+
 
-_model = None
+def create_transcription_backend(
+    model_name: str | None = None, threads: int = 0, workers: int = 1
+) -> TranscriptionBackend:
+    backend_cls = _backends.get(settings.transcription_backend)
+    if backend_cls is None:
+        raise ValueError(
+            f"Unknown transcription backend '{settings.transcription_backend}', "
+            f"expected one of: {', '.join(sorted(_backends))}"
+        )
+    return backend_cls(model_name or settings.whisper_model, threads, workers)
 
 
-def get_whisper_model():
-    global _model
-    if _model is None:
-        _model = whisper.load_model(settings.whisper_model)
-    return _model
+_backend: TranscriptionBackend | None = None
 
 
-async def download_audio(url: str, meeting_id: int) -> str:
-    os.makedirs(settings.upload_dir, exist_ok=True)
+def get_transcription_backend() -> TranscriptionBackend:
+    global _backend
+    if _backend is None:
+        _backend = create_transcription_backend(
+            threads=settings.whisper_threads, workers=settings.transcription_workers
+        )
+    return _backend
+
+
+async def download_audio(
+    url: str,
+    meeting_id: int,
+    on_progress: Callable[[int, int | None], None] | None = None,
+    refresh_url: Callable[[], Awaitable[str | None]] | None = None,
+) -> str:
+    """Download a recording to the upload dir, resuming a previous partial download.
+
+    on_progress(bytes_done, total_bytes) is called as data is written; total is
+    None when the server doesn't send a length. refresh_url is awaited for a new
+    URL if the current one expires.
+    """
     file_path = os.path.join(settings.upload_dir, f"meeting_{meeting_id}.audio")
+    downloader = RangeDownloader(url, file_path, refresh_url=refresh_url, on_progress=on_progress)
+    return await downloader.run()
+
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+VAD_FRAME_SECONDS = 0.03
+
+
+def load_audio(file_path: str) -> np.ndarray:
+    """16 kHz mono float32 samples; ingest's raw PCM files skip the ffmpeg decode."""
+    if file_path.endswith(PCM_SUFFIX):
+        return np.fromfile(file_path, dtype="<i2").astype(np.float32) / 32768.0
+    return whisper.load_audio(file_path)
+
+
+def _speech_frames(audio: np.ndarray) -> np.ndarray:
+    """Energy-based voice activity: one bool per 30 ms frame."""
+    frame = int(SAMPLE_RATE * VAD_FRAME_SECONDS)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    energy = np.sqrt(np.mean(frames ** 2, axis=1))
+    loud = np.percentile(energy, 95)
+    if loud <= 0:
+        return np.zeros(n_frames, dtype=bool)
+    return energy > loud * settings.vad_energy_threshold
+
+
+def split_on_silence(audio: np.ndarray, chunk_seconds: float) -> list[tuple[int, int]]:
+    """Split audio into ~chunk_seconds pieces, cutting in the middle of silences.
 
-    headers_primary = {}
-    headers_alt = {}
-    if ("recall.ai" in url or "recall.ai" in url.lower()) and settings.recall_api_key:
-        headers_primary = {"Authorization": f"Token {settings.recall_api_key}"}
-        headers_alt = {"Authorization": settings.recall_api_key}
-    elif ("zoom.us" in url or "zoom.us" in url.lower()) and settings.zoom_access_token:
-        headers_primary = {"Authorization": f"Bearer {settings.zoom_access_token}"}
-
-    # Use encoded=True to prevent double-encoding of pre-signed S3 URLs
-    request_url = URL(url, encoded=True)
-
-    async with aiohttp.ClientSession() as session:
-        async def _download(h):
-            async with session.get(request_url, headers=h) as response:
-                if response.status in (401, 403) and headers_alt:
-                    async with session.get(request_url, headers=headers_alt) as resp2:
-                        resp2.raise_for_status()
-                        with open(file_path, "wb") as f:
-                            async for chunk in resp2.content.iter_chunked(8192):
-                                f.write(chunk)
-                        return
-                response.raise_for_status()
-                with open(file_path, "wb") as f:
-                    async for chunk in response.content.iter_chunked(8192):
-                        f.write(chunk)
-        await _download(headers_primary)
-
-    return file_path
+    Returns (start, end) sample ranges. Chunks with no detected speech are dropped.
+    """
+    speech = _speech_frames(audio)
+    frame = int(SAMPLE_RATE * VAD_FRAME_SECONDS)
+    target = max(1, int(chunk_seconds / VAD_FRAME_SECONDS))
+    min_silence = max(1, int(settings.vad_min_silence_ms / 1000 / VAD_FRAME_SECONDS))
+    # Look for a cut point within the last quarter of each chunk
+    search = max(min_silence, target // 4)
+
+    cuts = [0]
+    pos = 0
+    while pos + target < len(speech):
+        window_start = max(pos + 1, pos + target - search)
+        window = speech[window_start:pos + target]
+        best = None
+        run = 0
+        for i, is_speech in enumerate(window):
+            run = 0 if is_speech else run + 1
+            if run >= min_silence and (best is None or run > best[1]):
+                best = (window_start + i - run // 2, run)
+        pos = best[0] if best else pos + target
+        cuts.append(pos)
+    cuts.append(len(speech))
+
+    ranges = []
+    for i in range(len(cuts) - 1):
+        if speech[cuts[i]:cuts[i + 1]].any():
+            # The last chunk also takes the sub-frame tail of the recording
+            end = len(audio) if i == len(cuts) - 2 else cuts[i + 1] * frame
+            ranges.append((cuts[i] * frame, end))
+    return ranges
+
+
+def _transcribe_chunk(audio: np.ndarray | str, offset: float) -> list[dict]:
+    segments = get_transcription_backend().transcribe(audio)
+    if offset:
+        for seg in segments:
+            seg["start"] += offset
+            seg["end"] += offset
+    return segments
+
+
+def _transcribe_chunked(file_path: str, workers: int) -> list[dict]:
+    audio = load_audio(file_path)
+    ranges = split_on_silence(audio, settings.transcription_chunk_seconds)
+    if not ranges:
+        return _transcribe_chunk(audio, 0.0)
+
+    # Chunks are cached with times relative to their own start, matched by their
+    # samples or, for re-encoded copies, by a spectral fingerprint
+    cache = get_transcription_cache()
+    results: list[list[dict] | None] = [None] * len(ranges)
+    keys: list[str | None] = [None] * len(ranges)
+    fingerprints: list[np.ndarray | None] = [None] * len(ranges)
+    if cache:
+        for i, (start, end) in enumerate(ranges):
+            keys[i], fingerprints[i], results[i] = cache.get_chunk(audio[start:end])
+    missing = [i for i, r in enumerate(results) if r is None]
+
+    # Celery's prefork children are daemonic and can't start processes of their own, so
+    # chunks run on threads over the worker's one loaded model. Backends that aren't
+    # thread-safe decode them one after another.
+    backend = get_transcription_backend()
+    parallel = min(workers, len(missing)) if backend.thread_safe else 1
+    with ThreadPoolExecutor(max_workers=max(1, parallel), thread_name_prefix="transcribe-chunk") as pool:
+        futures = {
+            i: pool.submit(_transcribe_chunk, audio[ranges[i][0]:ranges[i][1]], 0.0)
+            for i in missing
+        }
+        for i, future in futures.items():
+            results[i] = future.result()
+            if cache:
+                cache.put_chunk(keys[i], fingerprints[i], results[i])
+
+    segments = []
+    for (start, _end), chunk_segments in zip(ranges, results):
+        offset = start / SAMPLE_RATE
+        for seg in chunk_segments:
+            segments.append({**seg, "start": seg["start"] + offset, "end": seg["end"] + offset})
+    return segments
 
 
 def transcribe_audio_file(file_path: str) -> dict:
-    model = get_whisper_model()
-    result = model.transcribe(file_path)
+    cache = get_transcription_cache()
+    if cache:
+        key = cache.key("file", file_digest(file_path))
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    workers = settings.transcription_workers
+    if workers > 1 or cache:
+        # The chunked path also lets a partly known recording reuse cached chunks
+        items = _transcribe_chunked(file_path, workers)
+    elif file_path.endswith(PCM_SUFFIX):
+        items = _transcribe_chunk(load_audio(file_path), 0.0)
+    else:
+        items = _transcribe_chunk(file_path, 0.0)
 
-    return {
-        "text": result["text"],
+    result = {
+        "text": "".join(seg["text"] for seg in items),
         "segments": {
-            "items": [
-                {
-                    "start": seg["start"],
-                    "end": seg["end"],
-                    "text": seg["text"]
-                }
-                for seg in result["segments"]
-            ]
+            "items": items
         }
     }
+    if cache:
+        cache.put(key, result)
+    return result
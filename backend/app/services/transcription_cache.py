@@ -0,0 +1,219 @@
+"""Content-addressed cache of transcription results.
+
+Entries are JSON files named by a hash of the audio content plus everything that
+changes the output (backend, model, quantization). Whole files are keyed by the
+digest of their bytes; chunks of the chunked engine by the digest of their
+decoded samples, so a re-muxed recording that decodes to the same samples
+reuses segments even when the container bytes differ.
+
+Chunks that were re-encoded (a different codec, bitrate or gain) decode to
+slightly different samples, so each chunk entry also stores a coarse spectral
+fingerprint and is listed in an index entry for its duration. When
+transcription_cache_match_tolerance is set (it is off by default), a chunk
+without an exact hit is compared against the chunks of about the same length
+and reuses the closest one within the tolerance. Candidates come from every
+meeting on the host and near-silent chunks look alike, so only enable it
+where a wrong or borrowed transcript is acceptable. Only chunks cut at the
+same places in the speech can match; a copy trimmed at the start is split
+differently and isn't recognized.
+
+Files are shared by all worker processes on the host and the least recently
+used ones are evicted past the size limit.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.services.transcode import PCM_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1024 * 1024
+
+FINGERPRINT_FRAME = PCM_SAMPLE_RATE // 2  # one row of band energies per half second
+FINGERPRINT_BANDS = 16
+FINGERPRINT_FLOOR_DB = -40.0  # relative to the loudest band; keeps silence from dominating
+FINGERPRINT_BLOCK = 64  # frames per FFT batch, bounds memory on long chunks
+# Log-spaced bands over the speech range, as rfft bin indices of one frame
+_BAND_EDGES = np.unique(
+    (np.geomspace(100, 4000, FINGERPRINT_BANDS + 1) * FINGERPRINT_FRAME / PCM_SAMPLE_RATE).astype(int)
+)
+INDEX_MAX_ENTRIES = 256  # chunk keys remembered per duration
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(READ_SIZE)
+            if not block:
+                return h.hexdigest()
+            h.update(block)
+
+
+def samples_digest(audio: np.ndarray) -> str:
+    # Quantize to PCM16 so float noise from different decode paths doesn't matter
+    pcm = np.clip(audio * 32768.0, -32768, 32767).astype("<i2")
+    return hashlib.sha256(pcm.tobytes()).hexdigest()
+
+
+def audio_fingerprint(audio: np.ndarray) -> np.ndarray:
+    """Band energies in dB per half second, relative to the loudest band: (frames, bands).
+
+    Coarse enough that re-encoding or a gain change barely moves it.
+    """
+    n = len(audio) // FINGERPRINT_FRAME
+    frames = audio[: n * FINGERPRINT_FRAME].reshape(n, FINGERPRINT_FRAME)
+    bands = np.empty((n, len(_BAND_EDGES) - 1), dtype=np.float64)
+    for i in range(0, n, FINGERPRINT_BLOCK):
+        power = np.abs(np.fft.rfft(frames[i:i + FINGERPRINT_BLOCK], axis=1)[:, :_BAND_EDGES[-1]]) ** 2
+        bands[i:i + FINGERPRINT_BLOCK] = np.add.reduceat(power, _BAND_EDGES[:-1], axis=1)
+    db = 10 * np.log10(bands + 1e-12)
+    if n:
+        db -= db.max()
+    return np.round(np.maximum(db, FINGERPRINT_FLOOR_DB), 1)
+
+
+def fingerprint_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute dB difference; chunks differing by more than one frame never match."""
+    if abs(len(a) - len(b)) > 1 or a.shape[1:] != b.shape[1:]:
+        return float("inf")
+    n = min(len(a), len(b))
+    if n == 0:
+        return float("inf")
+    return float(np.mean(np.abs(a[:n] - b[:n])))
+
+
+def _decode_options() -> str:
+    options = {"backend": settings.transcription_backend, "model": settings.whisper_model}
+    if settings.transcription_backend == "faster-whisper":
+        options["compute_type"] = settings.whisper_compute_type
+    return json.dumps(options, sort_keys=True)
+
+
+class TranscriptionCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, kind: str, digest: str) -> str:
+        return hashlib.sha256(f"{kind}:{digest}:{_decode_options()}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str, touch: bool = True) -> Optional[Any]:
+        """Entry for `key`, or None. touch=False reads without counting it as used."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if touch:
+            self._touch(path)
+        return value
+
+    def _touch(self, path: str):
+        try:
+            os.utime(path)  # mtime doubles as last-used time for eviction
+        except OSError:
+            pass
+
+    def put(self, key: str, value: Any):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            logger.warning(f"Failed to write transcription cache entry: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._evict()
+
+    def get_chunk(self, audio: np.ndarray) -> tuple[str, np.ndarray, Optional[list[dict]]]:
+        """Look up cached segments for a chunk of samples.
+
+        Returns (key, fingerprint, segments), with segments None on a miss; pass
+        key and fingerprint to put_chunk() once the chunk is transcribed.
+        """
+        key = self.key("chunk", samples_digest(audio))
+        fingerprint = audio_fingerprint(audio)
+        entry = self.get(key)
+        if entry is not None:
+            # Entries written before fingerprints were stored are the bare segment list
+            return key, fingerprint, entry["segments"] if isinstance(entry, dict) else entry
+
+        tolerance = settings.transcription_cache_match_tolerance
+        best = None
+        if tolerance > 0:
+            for bucket in (len(fingerprint) - 1, len(fingerprint), len(fingerprint) + 1):
+                for candidate in self.get(self._index_key(bucket), touch=False) or []:
+                    # Scanning isn't use; only the entry that is reused gets its mtime bumped
+                    entry = self.get(candidate, touch=False)
+                    if entry is None:
+                        continue
+                    distance = fingerprint_distance(fingerprint, np.asarray(entry["fingerprint"]))
+                    if distance <= tolerance and (best is None or distance < best[0]):
+                        best = (distance, candidate, entry["segments"])
+        if best is not None:
+            self._touch(self._path(best[1]))
+            logger.warning(f"Transcription cache: reusing segments of similar chunk {best[1]} ({best[0]:.2f} dB apart)")
+            return key, fingerprint, best[2]
+        return key, fingerprint, None
+
+    def put_chunk(self, key: str, fingerprint: np.ndarray, segments: list[dict]):
+        self.put(key, {"fingerprint": fingerprint.tolist(), "segments": segments})
+        # Concurrent writers may drop each other's additions; that only costs a miss
+        index_key = self._index_key(len(fingerprint))
+        keys = [k for k in self.get(index_key, touch=False) or [] if k != key]
+        keys.append(key)
+        self.put(index_key, keys[-INDEX_MAX_ENTRIES:])
+
+    def _index_key(self, frames: int) -> str:
+        return self.key("chunk-index", str(frames))
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% so we don't evict on every write once full
+        target = self.max_bytes * 0.9
+        for _mtime, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+_cache: Optional[TranscriptionCache] = None
+
+
+def get_transcription_cache() -> Optional[TranscriptionCache]:
+    global _cache
+    if not settings.transcription_cache_enabled:
+        return None
+    if _cache is None:
+        directory = settings.transcription_cache_dir or os.path.join(settings.upload_dir, "transcription_cache")
+        _cache = TranscriptionCache(directory, settings.transcription_cache_max_mb * 1024 * 1024)
+    return _cache
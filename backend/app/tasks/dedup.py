@@ -0,0 +1,161 @@
+"""Per-meeting, per-stage deduplication for Celery tasks.
+
+One Redis key `task:<stage>:<meeting_id>` holds the id of the task that owns a
+stage of a meeting while it is queued or running. `enqueue_once` reserves it
+for `task_queue_ttl` seconds before publishing, so a duplicate enqueue (a
+redelivered webhook, a user retry while the webhook path is still running)
+gets the existing task's AsyncResult instead of a second run. `@single_flight`
+claims the same key when the task starts, which also stops tasks enqueued with
+a plain `.delay()`, and releases it when the task ends however it ends, so a
+later regeneration always runs. While the task runs, a heartbeat thread keeps
+renewing the claim for `task_lock_ttl`, so a worker killed outright (OOM,
+SIGKILL) leaves a lock that expires within that TTL instead of one whose
+PENDING holder looks alive for hours.
+"""
+
+import functools
+import logging
+import threading
+import uuid
+from typing import Optional
+
+import redis
+from celery import Task
+from celery.result import AsyncResult
+
+from app.celery_app import celery_app
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEAD_STATES = ("FAILURE", "REVOKED")
+
+# Take the key unless another live task holds it; returns the holder's id otherwise
+_CLAIM = """
+local cur = redis.call('GET', KEYS[1])
+if cur and cur ~= ARGV[1] then return cur end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return false
+"""
+_DELETE_IF_OWNER = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+return 0
+"""
+_EXPIRE_IF_OWNER = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('EXPIRE', KEYS[1], ARGV[2]) end
+return 0
+"""
+
+_redis: Optional[redis.Redis] = None
+
+
+def _client() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis
+
+
+def _key(stage: str, meeting_id: int) -> str:
+    return f"task:{stage}:{meeting_id}"
+
+
+def _claim(key: str, task_id: str, ttl: int) -> Optional[str]:
+    """Claim `key` for `task_id` for `ttl` seconds (extending its own claim).
+
+    Returns the id of another live holder, or None if claimed.
+    """
+    r = _client()
+    for _ in range(2):
+        holder = r.eval(_CLAIM, 1, key, task_id, ttl)
+        if holder is None:
+            return None
+        if AsyncResult(holder, app=celery_app).state not in DEAD_STATES:
+            return holder
+        # The holder failed without releasing (e.g. revoked); take over
+        r.eval(_DELETE_IF_OWNER, 1, key, holder)
+    return r.get(key)
+
+
+def enqueue_once(task: Task | str, meeting_id: int, stage: str, *args, **kwargs) -> AsyncResult:
+    """Enqueue `task` unless `stage` is already queued or running for the meeting.
+
+    `task` is a task object or a registered task name (sent with send_task).
+    Returns the AsyncResult of whichever task owns the stage. The claim is
+    task_queue_ttl until the task starts, so a message lost before reaching a
+    worker blocks the stage for at most that long.
+    """
+    task_id = str(uuid.uuid4())
+    key = _key(stage, meeting_id)
+    try:
+        holder = _claim(key, task_id, settings.task_queue_ttl)
+    except redis.RedisError as e:
+        logger.warning(f"Task dedup unavailable ({e}), enqueueing {stage} for meeting {meeting_id} anyway")
+        holder = None
+    if holder:
+        logger.info(f"{stage} for meeting {meeting_id} already owned by task {holder}, attaching")
+        return AsyncResult(holder, app=celery_app)
+
+    try:
+        if isinstance(task, str):
+            return celery_app.send_task(task, args=args, kwargs=kwargs, task_id=task_id)
+        return task.apply_async(args=args, kwargs=kwargs, task_id=task_id)
+    except Exception:
+        _release(key, task_id)
+        raise
+
+
+def _release(key: str, task_id: str):
+    try:
+        _client().eval(_DELETE_IF_OWNER, 1, key, task_id)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to release {key}: {e}")
+
+
+def _heartbeat(key: str, task_id: str, stop: threading.Event):
+    """Renew the claim every third of task_lock_ttl until `stop` is set."""
+    ttl = settings.task_lock_ttl
+    while not stop.wait(max(1, ttl // 3)):
+        try:
+            if not _client().eval(_EXPIRE_IF_OWNER, 1, key, task_id, ttl):
+                logger.warning(f"Lost {key} while task {task_id} is still running")
+                return
+        except redis.RedisError as e:
+            logger.warning(f"Failed to renew {key}: {e}")
+
+
+def single_flight(stage: str):
+    """Run a bound task taking `meeting_id` first only if it owns `stage` for that meeting.
+
+    Place below `@celery_app.task(bind=True)`. A duplicate returns
+    {"status": "duplicate", "task_id": <owner>} without doing any work. The
+    stage is released when the task returns or raises.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, meeting_id, *args, **kwargs):
+            if meeting_id is None:
+                return fn(self, meeting_id, *args, **kwargs)
+
+            key = _key(stage, meeting_id)
+            task_id = self.request.id
+            try:
+                holder = _claim(key, task_id, settings.task_lock_ttl)
+            except redis.RedisError as e:
+                logger.warning(f"Task dedup unavailable ({e}), running {stage} for meeting {meeting_id} unlocked")
+                return fn(self, meeting_id, *args, **kwargs)
+            if holder:
+                logger.info(f"Skipping duplicate {stage} for meeting {meeting_id}, owned by task {holder}")
+                return {"status": "duplicate", "meeting_id": meeting_id, "task_id": holder}
+
+            stop = threading.Event()
+            threading.Thread(
+                target=_heartbeat, args=(key, task_id, stop), name=f"lock-{key}", daemon=True
+            ).start()
+            try:
+                return fn(self, meeting_id, *args, **kwargs)
+            finally:
+                stop.set()
+                _release(key, task_id)
+        return wrapper
+    return decorator
@@ -4,7 +4,7 @@ from sqlalchemy.orm import joinedload
 from app.celery_app import celery_app
 from app.models.meeting import Meeting, Summary, Participant
 from app.services.email import send_followup_email
-from app.tasks.transcription import get_sync_session
+from app.database import get_sync_session
 
 
 @celery_app.task(bind=True)
@@ -0,0 +1,163 @@
+"""Recording ingest stage: resolve the recording, download it, hand off to transcription."""
+
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import select
+
+from app.celery_app import celery_app
+from app.config import settings
+from app.database import get_sync_session
+from app.models.meeting import Meeting
+from app.services.event_loop import run_sync
+from app.services.live_events import get_sync_redis
+from app.services.recall import recall_service
+from app.services.transcode import pcm_path_for, stream_transcode, transcode_file
+from app.services.transcription import download_audio
+from app.tasks.dedup import enqueue_once, single_flight
+from app.tasks.transcription import _extract_download_url, transcribe_audio_task
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL_SECONDS = 2.0
+
+
+async def _resolve_meeting_id(bot_id: str) -> int | None:
+    try:
+        mapped = get_sync_redis().get(f"recall:bot:{bot_id}")
+        if mapped:
+            return int(mapped.decode("utf-8"))
+    except Exception:
+        pass
+    try:
+        bot_data = await recall_service.get_bot(bot_id)
+        ext = bot_data.get("external_id") or (bot_data.get("metadata") or {}).get("meeting_id")
+        return int(str(ext)) if ext else None
+    except Exception:
+        return None
+
+
+async def _resolve_audio_url(bot_id: str | None, recording_id: str | None) -> str | None:
+    if bot_id:
+        url = await recall_service.get_bot_audio_url(bot_id)
+        if url:
+            return url
+    if recording_id:
+        try:
+            rec_data = await recall_service.get_recording(recording_id)
+            return _extract_download_url(rec_data)
+        except Exception:
+            pass
+    return None
+
+
+async def _fetch_audio(meeting_id: int, audio_url: str, on_progress, refresh_url) -> str:
+    """Fetch the recording, decoding it to PCM on the fly when possible."""
+    if not settings.ingest_transcode:
+        return await download_audio(audio_url, meeting_id, on_progress=on_progress, refresh_url=refresh_url)
+
+    pcm_path = pcm_path_for(meeting_id, settings.upload_dir)
+    os.makedirs(settings.upload_dir, exist_ok=True)
+    try:
+        return await stream_transcode(audio_url, pcm_path, on_progress=on_progress)
+    except Exception as e:
+        # Non-streamable container or a rejected URL: download (resumable, can refresh) then decode
+        logger.info(f"Streaming transcode failed for meeting {meeting_id} ({e}), downloading first")
+
+    source = await download_audio(audio_url, meeting_id, on_progress=on_progress, refresh_url=refresh_url)
+    await transcode_file(source, pcm_path)
+    if not settings.ingest_keep_video:
+        os.remove(source)
+    return pcm_path
+
+
+def refresh_recording_url(recording_id: str):
+    """Callback for download_audio that re-resolves an expired pre-signed URL."""
+    async def refresh() -> str | None:
+        rec_data = await recall_service.get_recording(recording_id)
+        return _extract_download_url(rec_data)
+    return refresh
+
+
+@celery_app.task(bind=True)
+@single_flight("ingest")
+def ingest_recording_task(
+    self,
+    meeting_id: int | None,
+    audio_url: str | None = None,
+    bot_id: str | None = None,
+    recording_id: str | None = None,
+):
+    """Fetch a finished recording and queue its transcription.
+
+    Runs on the `ingest` queue so downloads have their own concurrency limit.
+    Download progress is reported through the task state (PROGRESS, with
+    bytes_done/total_bytes).
+
+    Args:
+        meeting_id: Database meeting ID, or None to resolve it from bot_id
+        audio_url: Download URL from the webhook payload, if it had one
+        bot_id: Recall bot ID
+        recording_id: Recall recording ID, used to refresh an expired URL
+    """
+    if meeting_id is None and bot_id:
+        meeting_id = run_sync(_resolve_meeting_id(str(bot_id)))
+    if meeting_id is None:
+        return {"status": "ignored", "reason": "unknown meeting"}
+
+    if not audio_url:
+        audio_url = run_sync(_resolve_audio_url(bot_id and str(bot_id), recording_id and str(recording_id)))
+    if not audio_url:
+        return {"status": "ignored", "meeting_id": meeting_id, "reason": "no recording available"}
+
+    session = get_sync_session()
+
+    try:
+        meeting = session.execute(
+            select(Meeting).where(Meeting.id == meeting_id)
+        ).scalar_one_or_none()
+        if not meeting:
+            raise ValueError(f"Meeting {meeting_id} not found")
+
+        meeting.audio_url = audio_url
+        meeting.status = "downloading"
+        session.commit()
+
+        last_report = 0.0
+
+        def on_progress(done: int, total: int | None):
+            nonlocal last_report
+            now = time.monotonic()
+            if now - last_report < PROGRESS_INTERVAL_SECONDS and done != total:
+                return
+            last_report = now
+            self.update_state(
+                state="PROGRESS",
+                meta={"meeting_id": meeting_id, "bytes_done": done, "total_bytes": total},
+            )
+
+        refresh_url = refresh_recording_url(str(recording_id)) if recording_id else None
+        file_path = asyncio.run(_fetch_audio(meeting_id, audio_url, on_progress, refresh_url))
+
+        meeting.audio_file_path = file_path
+        meeting.status = "recording_completed"
+        session.commit()
+
+        task = enqueue_once(transcribe_audio_task, meeting_id, "transcribe", meeting_id)
+        return {"status": "success", "meeting_id": meeting_id, "transcription_task_id": str(task.id)}
+
+    except Exception:
+        # A failed flush leaves the session unusable until it is rolled back
+        session.rollback()
+        meeting = session.execute(
+            select(Meeting).where(Meeting.id == meeting_id)
+        ).scalar_one_or_none()
+        if meeting:
+            meeting.status = "download_failed"
+            session.commit()
+        raise
+
+    finally:
+        session.close()
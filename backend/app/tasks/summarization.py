@@ -1,12 +1,125 @@
+import logging
+import time
+from datetime import datetime
+
 from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
-from app.models.meeting import Meeting, Transcript, Summary
-from app.services.summarization import generate_meeting_summary_sync
-from app.tasks.transcription import get_sync_session
+from app.config import settings
+from app.models.meeting import Meeting, Transcript, Summary, TranscriptSegment
+from app.services.live_events import get_sync_redis, publish_summary_sync
+from app.services.summarization import (
+    estimate_tokens,
+    generate_meeting_summary_sync,
+    update_rolling_summary_sync,
+)
+from app.database import get_sync_session
+from app.services import llm_cache
+from app.tasks.dedup import enqueue_once, single_flight
+
+logger = logging.getLogger(__name__)
+
+
+def _notes(summary: Summary) -> dict:
+    return {
+        "summary": summary.text,
+        "action_items": summary.action_items or [],
+        "decisions": summary.decisions or [],
+    }
+
+
+def _new_segments(session: Session, meeting_id: int, after_seq: int) -> list[TranscriptSegment]:
+    return session.execute(
+        select(TranscriptSegment)
+        .where(TranscriptSegment.meeting_id == meeting_id, TranscriptSegment.seq > after_seq)
+        .order_by(TranscriptSegment.seq)
+    ).scalars().all()
+
+
+def schedule_rolling_summary(meeting_id: int, texts: list[str]):
+    """Count newly committed live segments and queue a rolling summary update when due.
+
+    Due once rolling_summary_tokens of new text have piled up, or
+    rolling_summary_minutes after the first segment not yet summarized.
+    """
+    if not settings.rolling_summary_enabled or not texts:
+        return
+    key = f"meeting:{meeting_id}:rolling_summary"
+    r = get_sync_redis()
+    now = time.time()
+    pipe = r.pipeline()
+    pipe.hincrbyfloat(key, "tokens", sum(estimate_tokens(t) for t in texts))
+    pipe.hsetnx(key, "since", now)
+    pipe.hget(key, "since")
+    pipe.expire(key, 24 * 3600)
+    tokens, _, since, _ = pipe.execute()
+    if tokens < settings.rolling_summary_tokens and now - float(since) < settings.rolling_summary_minutes * 60:
+        return
+    r.delete(key)
+    enqueue_once(update_rolling_summary_task, meeting_id, "rolling_summary", meeting_id)
+
+
+@celery_app.task(bind=True)
+@single_flight("rolling_summary")
+def update_rolling_summary_task(self, meeting_id: int):
+    """Fold segments committed since the last update into a live meeting's summary.
+
+    The running notes live in the meeting's Summary row (text, action_items,
+    decisions) with the last folded seq in rolling_state, so the final summary
+    only has to read the tail of the transcript.
+
+    Args:
+        meeting_id: Database meeting ID
+    """
+    session = get_sync_session()
+
+    try:
+        summary = session.execute(
+            select(Summary).where(Summary.meeting_id == meeting_id)
+        ).scalar_one_or_none()
+        state = (summary.rolling_state if summary else None) or {"last_seq": -1}
+        if state.get("final"):
+            return {"status": "final", "meeting_id": meeting_id}
+
+        rows = _new_segments(session, meeting_id, state["last_seq"])
+        if not rows:
+            return {"status": "empty", "meeting_id": meeting_id}
+
+        notes = update_rolling_summary_sync(
+            _notes(summary) if summary and summary.text else None,
+            [r.text for r in rows],
+        )
+
+        if summary:
+            # The final summary may have been written while we were waiting on the LLM
+            session.refresh(summary, with_for_update=True)
+            if (summary.rolling_state or {}).get("final"):
+                session.rollback()
+                return {"status": "final", "meeting_id": meeting_id}
+        else:
+            summary = Summary(meeting_id=meeting_id, text="")
+            session.add(summary)
+        summary.text = notes.get("summary", "")
+        summary.action_items = notes.get("action_items", [])
+        summary.decisions = notes.get("decisions", [])
+        summary.rolling_state = {"last_seq": rows[-1].seq, "updated_at": datetime.utcnow().isoformat(), "final": False}
+        session.commit()
+        llm_cache.invalidate_summaries()
+
+        try:
+            publish_summary_sync(meeting_id, notes)
+        except Exception as e:
+            logger.warning(f"Failed to publish rolling summary for meeting {meeting_id}: {e}")
+
+        return {"status": "success", "meeting_id": meeting_id, "last_seq": rows[-1].seq}
+
+    finally:
+        session.close()
 
 
 @celery_app.task(bind=True)
+@single_flight("summarize")
 def generate_summary_task(self, meeting_id: int):
     session = get_sync_session()
 
@@ -25,23 +138,50 @@ def generate_summary_task(self, meeting_id: int):
         if not transcript:
             raise ValueError(f"No transcript found for meeting {meeting_id}")
 
+        summary = session.execute(
+            select(Summary).where(Summary.meeting_id == meeting_id)
+        ).scalar_one_or_none()
+
         meeting.status = "summarizing"
         session.commit()
 
-        # Generate summary
-        result = generate_meeting_summary_sync(transcript.text)
+        # Generate summary; a live meeting's rolling summary only needs the segments since its last update
+        state = summary.rolling_state if summary else None
+        if state and not state.get("final"):
+            rows = _new_segments(session, meeting_id, state["last_seq"])
+            result = update_rolling_summary_sync(_notes(summary), [r.text for r in rows], final=True)
+            state = {**state, "last_seq": rows[-1].seq if rows else state["last_seq"], "final": True}
+        else:
+            version = llm_cache.data_version(f"transcript:{meeting_id}")
+            result = llm_cache.lookup("summary", settings.summary_model, transcript.text, version)
+            if result is None:
+                result = generate_meeting_summary_sync(transcript.text, transcript.segments)
+                llm_cache.store("summary", settings.summary_model, transcript.text, result, version)
 
         # Save summary
-        summary = Summary(
-            meeting_id=meeting_id,
-            text=result.get("summary", ""),
-            action_items=result.get("action_items", []),
-            decisions=result.get("decisions", [])
-        )
-        session.add(summary)
+        if summary:
+            summary.text = result.get("summary", "")
+            summary.action_items = result.get("action_items", [])
+            summary.decisions = result.get("decisions", [])
+            summary.rolling_state = state
+        else:
+            summary = Summary(
+                meeting_id=meeting_id,
+                text=result.get("summary", ""),
+                action_items=result.get("action_items", []),
+                decisions=result.get("decisions", [])
+            )
+            session.add(summary)
 
         meeting.status = "completed"
         session.commit()
+        llm_cache.invalidate_summaries()
+
+        if state:
+            try:
+                publish_summary_sync(meeting_id, result, final=True)
+            except Exception as e:
+                logger.warning(f"Failed to publish final summary for meeting {meeting_id}: {e}")
 
         return {"status": "success", "meeting_id": meeting_id}
 
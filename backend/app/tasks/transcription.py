@@ -1,11 +1,15 @@
 import asyncio
+import os
 from sqlalchemy import select
-from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
-from app.database import engine
+from app.database import get_sync_session
 from app.models.meeting import Meeting, Transcript
+from app.services import llm_cache
+from app.services.event_loop import run_sync
+from app.services.segment_writer import replace_segments
 from app.services.transcription import download_audio, transcribe_audio_file
+from app.tasks.dedup import enqueue_once, single_flight
 
 
 def _extract_download_url(rec: dict) -> str | None:
@@ -23,18 +27,8 @@ def _extract_download_url(rec: dict) -> str | None:
     return None
 
 
-def get_sync_session():
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from app.config import settings
-
-    sync_url = settings.database_url.replace("+asyncpg", "")
-    sync_engine = create_engine(sync_url)
-    SessionLocal = sessionmaker(bind=sync_engine)
-    return SessionLocal()
-
-
 @celery_app.task(bind=True)
+@single_flight("transcribe")
 def transcribe_audio_task(self, meeting_id: int):
     session = get_sync_session()
 
@@ -49,11 +43,11 @@ def transcribe_audio_task(self, meeting_id: int):
         meeting.status = "transcribing"
         session.commit()
 
-        # Get audio file path
-        if meeting.audio_url:
-            file_path = asyncio.run(download_audio(meeting.audio_url, meeting_id))
-        elif meeting.audio_file_path:
+        # Get audio file path, reusing a file the ingest stage already downloaded
+        if meeting.audio_file_path and os.path.exists(meeting.audio_file_path):
             file_path = meeting.audio_file_path
+        elif meeting.audio_url:
+            file_path = asyncio.run(download_audio(meeting.audio_url, meeting_id))
         else:
             raise ValueError("No audio source available")
 
@@ -75,17 +69,22 @@ def transcribe_audio_task(self, meeting_id: int):
             )
             session.add(transcript)
 
+        replace_segments(session, meeting_id, result["segments"]["items"])
+
         meeting.status = "transcribed"
         session.commit()
+        llm_cache.invalidate_transcript(meeting_id)
 
         try:
-            celery_app.send_task("app.tasks.summarization.generate_summary_task", args=[meeting_id])
+            enqueue_once("app.tasks.summarization.generate_summary_task", meeting_id, "summarize", meeting_id)
         except Exception:
             pass
 
         return {"status": "success", "meeting_id": meeting_id}
 
     except Exception as e:
+        # A failed flush (e.g. in replace_segments) leaves the session unusable until rolled back
+        session.rollback()
         meeting = session.execute(
             select(Meeting).where(Meeting.id == meeting_id)
         ).scalar_one_or_none()
@@ -99,6 +98,7 @@ def transcribe_audio_task(self, meeting_id: int):
 
 
 @celery_app.task(bind=True)
+@single_flight("transcribe")
 def transcribe_audio_from_url_task(self, meeting_id: int, source_url: str, recording_id: str | None = None):
     session = get_sync_session()
 
@@ -120,15 +120,21 @@ def transcribe_audio_from_url_task(self, meeting_id: int, source_url: str, recor
         if recording_id:
             try:
                 # Get fresh URL from recording endpoint
-                rec_data = asyncio.run(recall_service.get_recording(str(recording_id)))
+                rec_data = run_sync(recall_service.get_recording(str(recording_id)))
                 fresh_url = _extract_download_url(rec_data) or rec_data.get("download_url")
                 if fresh_url:
                     download_url = fresh_url
             except Exception:
                 pass  # Fall back to source_url
 
+        async def refresh_url() -> str | None:
+            rec_data = await recall_service.get_recording(str(recording_id))
+            return _extract_download_url(rec_data)
+
         try:
-            file_path = asyncio.run(download_audio(download_url, meeting_id))
+            file_path = asyncio.run(
+                download_audio(download_url, meeting_id, refresh_url=refresh_url if recording_id else None)
+            )
             meeting.audio_url = download_url
         except Exception as e:
             # If download fails, the URL may be expired
@@ -154,17 +160,21 @@ def transcribe_audio_from_url_task(self, meeting_id: int, source_url: str, recor
             )
             session.add(transcript)
 
+        replace_segments(session, meeting_id, result["segments"]["items"])
+
         meeting.status = "transcribed"
         session.commit()
+        llm_cache.invalidate_transcript(meeting_id)
 
         try:
-            celery_app.send_task("app.tasks.summarization.generate_summary_task", args=[meeting_id])
+            enqueue_once("app.tasks.summarization.generate_summary_task", meeting_id, "summarize", meeting_id)
         except Exception:
             pass
 
         return {"status": "success", "meeting_id": meeting_id}
 
     except Exception:
+        session.rollback()
         meeting = session.execute(
             select(Meeting).where(Meeting.id == meeting_id)
         ).scalar_one_or_none()
@@ -6,23 +6,18 @@ from sqlalchemy.orm import Session
 import logging
 
 from app.celery_app import celery_app
-from app.models.meeting import Meeting
+from app.database import get_sync_session
+from app.models.meeting import Meeting, TranscriptSegment
+from app.services import llm_cache
+from app.services.live_events import publish_status_sync
+from app.services.segment_writer import allocate_seq, materialize_transcript
 from app.services.zoom_bot import zoom_bot_service
+from app.tasks.dedup import enqueue_once
+from app.tasks.summarization import generate_summary_task, schedule_rolling_summary
 
 logger = logging.getLogger(__name__)
 
 
-def get_sync_session():
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from app.config import settings
-
-    sync_url = settings.database_url.replace("+asyncpg", "")
-    sync_engine = create_engine(sync_url)
-    SessionLocal = sessionmaker(bind=sync_engine)
-    return SessionLocal()
-
-
 @celery_app.task(bind=True, name="app.tasks.zoom_bot.start_zoom_recording_task")
 def start_zoom_recording_task(self, meeting_id: int, zoom_meeting_id: str, zoom_meeting_uuid: str):
     """Start recording for a Zoom meeting via API.
@@ -242,7 +237,18 @@ def stop_zoom_bot_task(self, meeting_id: int):
         meeting.is_streaming = False
         meeting.bot_left_at = datetime.now(timezone.utc)
         meeting.status = "streaming_ended"
+        transcript = materialize_transcript(session, meeting_id)
         session.commit()
+        llm_cache.invalidate_transcript(meeting_id)
+
+        try:
+            publish_status_sync(meeting_id, "streaming_ended")
+        except Exception as e:
+            logger.warning(f"Failed to publish end of stream for meeting {meeting_id}: {e}")
+
+        if transcript:
+            # Finishes the rolling summary, so only the last few minutes need the LLM
+            enqueue_once(generate_summary_task, meeting_id, "summarize", meeting_id)
 
         # TODO: Call Zoom API to stop bot if needed
 
@@ -257,64 +263,66 @@ def stop_zoom_bot_task(self, meeting_id: int):
 
 @celery_app.task(bind=True)
 def save_transcript_segment_task(
-    self, meeting_id: int, text: str, timestamp: str, confidence: float = 0.0
+    self, meeting_id: int, text: str, timestamp: str, confidence: float = 0.0, speaker: str | None = None
 ):
-    """Save a transcription segment to the database.
+    """Append a single transcription segment.
+
+    Live ingest batches segments through SegmentBuffer instead; this stays for
+    producers that still send one segment at a time.
 
     Args:
         meeting_id: Database meeting ID
         text: Transcribed text segment
         timestamp: ISO format timestamp
         confidence: Confidence score from transcription model
+        speaker: Speaker label, if the producer knows it
     """
     session = get_sync_session()
 
     try:
-        from app.models.meeting import Transcript
-
-        meeting = session.execute(
-            select(Meeting).where(Meeting.id == meeting_id)
-        ).scalar_one_or_none()
-
-        if not meeting:
-            raise ValueError(f"Meeting {meeting_id} not found")
-
-        # Get or create transcript
-        transcript = session.execute(
-            select(Transcript).where(Transcript.meeting_id == meeting_id)
-        ).scalar_one_or_none()
-
-        if not transcript:
-            transcript = Transcript(
+        seq = allocate_seq(session, meeting_id)
+        try:
+            created_at = datetime.fromisoformat(timestamp)
+        except ValueError:
+            created_at = datetime.utcnow()
+        session.add(
+            TranscriptSegment(
                 meeting_id=meeting_id,
+                seq=seq,
                 text=text,
-                segments=[
-                    {
-                        "text": text,
-                        "timestamp": timestamp,
-                        "confidence": confidence,
-                    }
-                ],
-            )
-            session.add(transcript)
-        else:
-            # Append to existing transcript
-            transcript.text += " " + text
-            if not transcript.segments:
-                transcript.segments = []
-            transcript.segments.append(
-                {
-                    "text": text,
-                    "timestamp": timestamp,
-                    "confidence": confidence,
-                }
+                speaker=speaker,
+                confidence=confidence,
+                created_at=created_at,
             )
-
+        )
         session.commit()
+
+        try:
+            schedule_rolling_summary(meeting_id, [text])
+        except Exception as e:
+            logger.warning(f"Failed to schedule rolling summary for meeting {meeting_id}: {e}")
         return {"status": "success", "meeting_id": meeting_id}
 
-    except Exception as e:
-        raise
+    finally:
+        session.close()
+
+
+@celery_app.task(bind=True)
+def materialize_transcript_task(self, meeting_id: int):
+    """Rebuild the full Transcript row from appended segments and queue the final summary.
+
+    Args:
+        meeting_id: Database meeting ID
+    """
+    session = get_sync_session()
+
+    try:
+        transcript = materialize_transcript(session, meeting_id)
+        session.commit()
+        llm_cache.invalidate_transcript(meeting_id)
+        if transcript:
+            enqueue_once(generate_summary_task, meeting_id, "summarize", meeting_id)
+        return {"status": "success" if transcript else "empty", "meeting_id": meeting_id}
 
     finally:
         session.close()
@@ -8,24 +8,16 @@ import time
 from zoneinfo import ZoneInfo
 
 from app.celery_app import celery_app
+from app.database import get_sync_session
+from app.services.transcode import pcm_path_for, transcode_file
 from app.models.meeting import Meeting
+from app.tasks.dedup import enqueue_once
 from app.tasks.transcription import transcribe_audio_task
 
 
 logger = logging.getLogger(__name__)
 
 
-def get_sync_session():
-    from sqlalchemy import create_engine
-    from sqlalchemy.orm import sessionmaker
-    from app.config import settings
-
-    sync_url = settings.database_url.replace("+asyncpg", "")
-    sync_engine = create_engine(sync_url)
-    SessionLocal = sessionmaker(bind=sync_engine)
-    return SessionLocal()
-
-
 def _write_zoomrec_csv(csv_path: str, zoom_url: str, description: str, duration_minutes: int, tz: str):
     tzinfo = ZoneInfo(tz)
     when = datetime.now(tzinfo) + timedelta(minutes=1)
@@ -122,11 +114,19 @@ def start_zoomrec_task(self, meeting_id: int, zoom_url: str, duration_minutes: i
             session.commit()
             raise RuntimeError("No recording file produced by zoomrec")
 
+        if settings.ingest_transcode:
+            # Keep only the audio transcription needs, not the full screen recording
+            import asyncio
+            video_file = final_file
+            final_file = asyncio.run(transcode_file(video_file, pcm_path_for(meeting_id, settings.upload_dir)))
+            if not settings.ingest_keep_video:
+                os.remove(video_file)
+
         meeting.audio_file_path = final_file
         meeting.status = "recording_completed"
         session.commit()
 
-        task = transcribe_audio_task.delay(meeting_id)
+        task = enqueue_once(transcribe_audio_task, meeting_id, "transcribe", meeting_id)
 
         return {"status": "accepted", "meeting_id": meeting_id, "recording": final_file, "task_id": str(task.id)}
 
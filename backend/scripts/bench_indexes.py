@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""Compare query plans of the hot lookups with and without their indexes.
+
+Builds the schema from the models in a scratch `bench` schema of DATABASE_URL,
+seeds it (100k meetings by default), then runs EXPLAIN ANALYZE on each lookup
+with the lookup indexes dropped and again after creating them. The scratch
+schema is dropped afterwards; nothing outside it is touched.
+
+    python -m scripts.bench_indexes [--meetings 100000]
+"""
+
+import argparse
+import re
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.database import Base
+from app.models import chat, meeting, user_access  # noqa: F401
+
+SCHEMA = "bench"
+
+# (table, name, DDL) for every index the lookups below depend on
+INDEXES = [
+    ("transcripts", "uq_transcripts_meeting_id",
+     "ALTER TABLE transcripts ADD CONSTRAINT uq_transcripts_meeting_id UNIQUE (meeting_id)"),
+    ("summaries", "uq_summaries_meeting_id",
+     "ALTER TABLE summaries ADD CONSTRAINT uq_summaries_meeting_id UNIQUE (meeting_id)"),
+    ("participants", "ix_participants_meeting_id",
+     "CREATE INDEX ix_participants_meeting_id ON participants (meeting_id)"),
+    ("meetings", "ix_meetings_zoom_meeting_uuid",
+     "CREATE INDEX ix_meetings_zoom_meeting_uuid ON meetings (zoom_meeting_uuid)"),
+    ("user_access", "uq_user_access_pubkey_meeting_id",
+     "ALTER TABLE user_access ADD CONSTRAINT uq_user_access_pubkey_meeting_id UNIQUE (pubkey, meeting_id)"),
+    ("user_access", "ix_user_access_meeting",
+     "CREATE INDEX ix_user_access_meeting ON user_access (meeting_id)"),
+    ("chat_messages", "ix_chat_messages_conversation_id_created_at",
+     "CREATE INDEX ix_chat_messages_conversation_id_created_at ON chat_messages (conversation_id, created_at)"),
+]
+
+QUERIES = {
+    "transcript by meeting": "SELECT * FROM transcripts WHERE meeting_id = :meeting_id",
+    "summary by meeting": "SELECT * FROM summaries WHERE meeting_id = :meeting_id",
+    "participants by meeting": "SELECT * FROM participants WHERE meeting_id = :meeting_id",
+    "meeting by zoom uuid": "SELECT * FROM meetings WHERE zoom_meeting_uuid = :zoom_uuid",
+    "access check": "SELECT 1 FROM user_access WHERE pubkey = :pubkey AND meeting_id = :meeting_id",
+    "meeting list page": """
+        SELECT m.id, m.title, m.status, m.created_at FROM meetings m
+        JOIN user_access ua ON ua.meeting_id = m.id AND ua.pubkey = :pubkey
+        ORDER BY m.created_at DESC, m.id DESC LIMIT 50
+    """,
+    "chat history": """
+        SELECT * FROM chat_messages WHERE conversation_id = :conversation_id ORDER BY created_at
+    """,
+}
+
+
+def seed(conn, meetings: int, pubkeys: int, conversations: int):
+    params = {"n": meetings, "pubkeys": pubkeys, "conversations": conversations}
+    conn.execute(text("""
+        INSERT INTO meetings (id, title, date, status, zoom_meeting_uuid, is_streaming, created_at)
+        SELECT g, 'Meeting ' || g, now() - g * interval '1 minute', 'completed',
+               md5(g::text), false, now() - g * interval '1 minute'
+        FROM generate_series(1, :n) g
+    """), params)
+    conn.execute(text("""
+        INSERT INTO transcripts (meeting_id, text, created_at)
+        SELECT g, repeat('word ', 200), now() FROM generate_series(1, :n) g
+    """), params)
+    conn.execute(text("""
+        INSERT INTO summaries (meeting_id, text, created_at)
+        SELECT g, repeat('summary ', 40), now() FROM generate_series(1, :n) g
+    """), params)
+    conn.execute(text("""
+        INSERT INTO participants (meeting_id, name, email)
+        SELECT g, 'Person ' || p, 'person' || p || '@example.com'
+        FROM generate_series(1, :n) g, generate_series(1, 3) p
+    """), params)
+    conn.execute(text("""
+        INSERT INTO user_access (pubkey, meeting_id, created_at)
+        SELECT 'pubkey-' || (g % :pubkeys), g, now() FROM generate_series(1, :n) g
+    """), params)
+    conn.execute(text("""
+        INSERT INTO conversations (id, created_at)
+        SELECT 'conv-' || c, now() FROM generate_series(1, :conversations) c
+    """), params)
+    conn.execute(text("""
+        INSERT INTO chat_messages (conversation_id, role, content, created_at)
+        SELECT 'conv-' || (g % :conversations), 'user', 'question ' || g, now() - g * interval '1 second'
+        FROM generate_series(1, :n * 2) g
+    """), params)
+    conn.execute(text("ANALYZE"))
+
+
+def drop_indexes(conn):
+    for table, name, ddl in INDEXES:
+        if ddl.startswith("ALTER TABLE"):
+            conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}"))
+        else:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    conn.execute(text("ANALYZE"))
+
+
+def create_indexes(conn):
+    for _, _, ddl in INDEXES:
+        conn.execute(text(ddl))
+    conn.execute(text("ANALYZE"))
+
+
+def explain(conn, sql: str, params: dict) -> tuple[str, float]:
+    """Return the top plan node and the execution time in ms."""
+    rows = [r[0] for r in conn.execute(text(f"EXPLAIN ANALYZE {sql}"), params)]
+    node = re.sub(r"\s+\(cost=.*", "", rows[0]).strip()
+    match = re.search(r"Execution Time: ([\d.]+) ms", rows[-1])
+    return node, float(match.group(1)) if match else float("nan")
+
+
+def run(conn, params: dict) -> dict:
+    results = {}
+    for name, sql in QUERIES.items():
+        explain(conn, sql, params)  # warm the cache
+        results[name] = explain(conn, sql, params)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=100_000)
+    parser.add_argument("--pubkeys", type=int, default=1_000)
+    parser.add_argument("--conversations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    engine = create_engine(settings.database_url.replace("+asyncpg", ""))
+    params = {
+        "meeting_id": args.meetings // 2,
+        "zoom_uuid": None,
+        "pubkey": "pubkey-7",
+        "conversation_id": "conv-7",
+    }
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"SET search_path TO {SCHEMA}"))
+            Base.metadata.create_all(conn)
+            started = time.monotonic()
+            seed(conn, args.meetings, args.pubkeys, args.conversations)
+            print(f"Seeded {args.meetings} meetings in {time.monotonic() - started:.1f}s")
+            params["zoom_uuid"] = conn.execute(
+                text("SELECT zoom_meeting_uuid FROM meetings WHERE id = :meeting_id"), params
+            ).scalar()
+
+            drop_indexes(conn)
+            before = run(conn, params)
+            create_indexes(conn)
+            after = run(conn, params)
+
+        width = max(len(name) for name in QUERIES)
+        for name in QUERIES:
+            (plan_before, ms_before), (plan_after, ms_after) = before[name], after[name]
+            print(f"\n{name:<{width}}  {ms_before:9.2f} ms -> {ms_after:9.2f} ms")
+            print(f"  before: {plan_before}")
+            print(f"  after:  {plan_after}")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
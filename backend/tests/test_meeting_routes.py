@@ -0,0 +1,99 @@
+"""GET /meetings/{id} with and without ?fields=, against a stub session."""
+
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import meetings
+from app.database import get_db
+from app.models.meeting import Meeting, Participant, Summary, Transcript
+
+CREATED = datetime(2025, 1, 6, 9, 30)
+
+
+class _Result:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar_one_or_none(self):
+        return self._value
+
+
+class _Session:
+    """Returns the same meeting for every query and records the statements."""
+
+    def __init__(self, meeting: Meeting):
+        self.meeting = meeting
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return _Result(self.meeting)
+
+
+def _meeting() -> Meeting:
+    meeting = Meeting(id=1, title="Weekly sync", date=CREATED, status="completed", created_at=CREATED)
+    meeting.transcript = Transcript(
+        id=2,
+        meeting_id=1,
+        text="Hello everyone.",
+        segments={"items": [{"start": 0.0, "end": 1.5, "text": "Hello everyone."}]},
+        created_at=CREATED,
+    )
+    meeting.summary = Summary(id=3, meeting_id=1, text="Greetings.", action_items=[], decisions=[], created_at=CREATED)
+    meeting.participants = [Participant(id=4, meeting_id=1, name="Ana", email="ana@example.com")]
+    return meeting
+
+
+@pytest.fixture
+def session():
+    return _Session(_meeting())
+
+
+@pytest.fixture
+def client(session):
+    app = FastAPI()
+    app.include_router(meetings.router, prefix="/meetings")
+
+    async def override_db():
+        yield session
+
+    app.dependency_overrides[get_db] = override_db
+    return TestClient(app)
+
+
+def test_default_returns_every_field(client, session):
+    resp = client.get("/meetings/1")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["transcript"]["text"] == "Hello everyone."
+    assert body["transcript"]["segments"]["items"][0]["text"] == "Hello everyone."
+    assert body["summary"]["text"] == "Greetings."
+    assert [p["name"] for p in body["participants"]] == ["Ana"]
+    assert len(session.statements) == 1
+
+
+def test_transcript_only_leaves_out_segments(client):
+    resp = client.get("/meetings/1", params={"fields": "transcript"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["transcript"]["text"] == "Hello everyone."
+    assert "segments" not in body["transcript"]
+    assert "summary" not in body
+    assert "participants" not in body
+
+
+def test_segments_include_transcript_text(client):
+    resp = client.get("/meetings/1", params={"fields": "segments"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["transcript"]["text"] == "Hello everyone."
+    assert body["transcript"]["segments"]["items"][0]["end"] == 1.5
+    assert "summary" not in body
+
+
+def test_unknown_field_is_rejected(client):
+    resp = client.get("/meetings/1", params={"fields": "transcript,audio"})
+    assert resp.status_code == 400
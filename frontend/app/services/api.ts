@@ -46,13 +46,22 @@ export const api = {
     if (publicKey) {
       headers['x-user-pubkey'] = publicKey;
     }
-    
-    const res = await fetch(`${API_BASE_URL}/meetings`, {
-      headers,
-      cache: 'no-store',
-    });
-    if (!res.ok) throw new Error('Failed to fetch meetings');
-    return res.json();
+
+    // The list is paginated; follow X-Next-Cursor until the last page
+    const meetings: Meeting[] = [];
+    let cursor: string | null = null;
+    do {
+      const params = new URLSearchParams({ limit: '200' });
+      if (cursor) params.set('cursor', cursor);
+      const res = await fetch(`${API_BASE_URL}/meetings?${params}`, {
+        headers,
+        cache: 'no-store',
+      });
+      if (!res.ok) throw new Error('Failed to fetch meetings');
+      meetings.push(...(await res.json()));
+      cursor = res.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return meetings;
   },
 
   async getMeeting(id: number | string, publicKey?: string): Promise<MeetingDetail> {